@@ -1,6 +1,11 @@
 from __future__ import annotations
 
-from fastapi import APIRouter
+import threading
+import time
+from typing import Any
+
+import orjson
+from fastapi import APIRouter, Response
 from pydantic import BaseModel
 
 try:
@@ -11,6 +16,15 @@ except Exception:
 
 router = APIRouter(prefix="/devices", tags=["devices"])
 
+# Device topology rarely changes between UI polls; avoid re-enumerating PortAudio host APIs
+_DEVICES_TTL_S = 3.0
+_devices_lock = threading.Lock()
+# (monotonic time, JSON body) of the last enumeration
+_devices_cache: tuple[float, bytes] | None = None
+
+# Pre-encoded body for the no-PortAudio / no-device path
+_EMPTY_DEVICES = orjson.dumps({"inputs": [], "outputs": []})
+
 
 class Device(BaseModel):
     id: str
@@ -19,28 +33,58 @@ class Device(BaseModel):
     is_default: bool = False
 
 
-@router.get("")
-def list_devices() -> dict[str, list[Device]]:
-    inputs: list[Device] = []
-    outputs: list[Device] = []
+class DeviceList(BaseModel):
+    # Documents the response shape; list_devices returns pre-encoded JSON
+    inputs: list[Device]
+    outputs: list[Device]
+
+
+def _query_devices() -> dict[str, list[dict[str, Any]]]:
+    inputs: list[dict[str, Any]] = []
+    outputs: list[dict[str, Any]] = []
 
     if sd is None:
         return {"inputs": inputs, "outputs": outputs}
 
     try:
         devices = sd.query_devices()
-        default_input = sd.default.device[0] if sd.default.device is not None else None
-        default_output = sd.default.device[1] if sd.default.device is not None else None
-        for idx, dev in enumerate(devices):
-            name = dev.get("name", f"Device {idx}")
-            if dev.get("max_input_channels", 0) > 0:
-                inputs.append(Device(id=str(idx), name=name, kind="input", is_default=(idx == default_input)))
-            if dev.get("max_output_channels", 0) > 0:
-                outputs.append(Device(id=str(idx), name=name, kind="output", is_default=(idx == default_output)))
+        # Each sd.default.device access goes through PortAudio; read it once
+        defaults = sd.default.device
+        default_input, default_output = (defaults[0], defaults[1]) if defaults is not None else (None, None)
+        # (idx, name, in_ch, out_ch) with a single dict lookup per field
+        rows = [
+            (idx, dev.get("name", f"Device {idx}"), dev.get("max_input_channels", 0), dev.get("max_output_channels", 0))
+            for idx, dev in enumerate(devices)
+        ]
+        # Fields are produced by us; plain dicts skip Pydantic validation
+        inputs = [
+            {"id": str(idx), "name": name, "kind": "input", "is_default": idx == default_input}
+            for idx, name, in_ch, _ in rows
+            if in_ch > 0
+        ]
+        outputs = [
+            {"id": str(idx), "name": name, "kind": "output", "is_default": idx == default_output}
+            for idx, name, _, out_ch in rows
+            if out_ch > 0
+        ]
     except Exception:
         # Fail softly; return empty lists if PortAudio not available
-        pass
+        inputs, outputs = [], []
 
     return {"inputs": inputs, "outputs": outputs}
 
 
+@router.get("", response_model=None, responses={200: {"model": DeviceList}})
+def list_devices(refresh: bool = False) -> Response:
+    global _devices_cache
+    if sd is None:
+        return Response(content=_EMPTY_DEVICES, media_type="application/json")
+    with _devices_lock:
+        now = time.monotonic()
+        if not refresh and _devices_cache is not None and now - _devices_cache[0] < _DEVICES_TTL_S:
+            body = _devices_cache[1]
+        else:
+            # Encoded once per enumeration; cache hits send the bytes as they are
+            body = orjson.dumps(_query_devices())
+            _devices_cache = (now, body)
+    return Response(content=body, media_type="application/json")
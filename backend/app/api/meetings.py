@@ -1,27 +1,32 @@
 from __future__ import annotations
 
-from datetime import datetime
 from typing import Optional, Any, Dict, List
 
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 from sqlmodel import Session
-import json
+import asyncio
 from pathlib import Path
 import os
 
 from app.deps import get_session
+from app.models.base import engine, utcnow
 from app.models.meeting import Meeting
 from app.models.audio_file import AudioFile
 from app.repositories.meetings import MeetingsRepository
 from app.repositories.audio_files import AudioFilesRepository
-from app.repositories.transcripts import TranscriptsRepository
 from app.services.transcription_service import start_transcription_job, get_status
 from app.repositories.settings import get_app_settings
 from app.services.summarization_service import summarize_meeting, LlmConfig
 import logging
 logger = logging.getLogger("app.api")
 
+try:
+    from app.services.audio_capture import start_recording, stop_recording
+except Exception:  # pragma: no cover - allow API import without audio backends
+    start_recording = None  # type: ignore
+    stop_recording = None  # type: ignore
+
 
 router = APIRouter(prefix="/meetings", tags=["meetings"])
 
@@ -55,64 +60,57 @@ async def start_meeting(body: StartMeetingRequest, session: Session = Depends(ge
     meeting = Meeting(
         title=body.title or "Untitled Meeting",
         language=body.language,
-        devices_used=json.dumps(devices_payload, ensure_ascii=False),
+        devices_used=devices_payload,
         status="recording",
     )
     meeting = MeetingsRepository(session).create(meeting)
 
     
     meeting_dir_id = str(meeting.id)
-    try:
-        from app.services.audio_capture import start_recording
-        import asyncio
-
-        loop = asyncio.get_running_loop()
-        start_recording(meeting_dir_id, body.mic_device_id, body.output_device_id, loop=loop)
-    except Exception:
-        
-        pass
+    if start_recording:
+        try:
+            loop = asyncio.get_running_loop()
+            start_recording(meeting_dir_id, body.mic_device_id, body.output_device_id, loop=loop)
+        except Exception:
+            
+            pass
 
     return {"meeting_id": meeting_dir_id}
 
 
-@router.post("/{meeting_id}/stop")
-async def stop_meeting(meeting_id: int, session: Session = Depends(get_session)) -> StopResponse:
-    
-    try:
-        from app.services.audio_capture import stop_recording
+def _persist_stop_metadata(meeting_id: int, info: Dict[str, Any]) -> None:
+    """Mark the meeting as done and register its recorded audio files.
 
-        info = stop_recording(str(meeting_id))
-    except Exception:
-        info = {}
-
-    
-    repo_m = MeetingsRepository(session)
-    meeting = repo_m.get(meeting_id)
-    if meeting is not None:
-        meeting.ended_at = datetime.utcnow()
+    Runs in a worker thread with its own session so file stats and SQLite writes
+    do not block the event loop.
+    """
+    with Session(engine) as session:
+        repo_m = MeetingsRepository(session)
+        meeting = repo_m.get(meeting_id)
+        if meeting is None:
+            return
+        meeting.ended_at = utcnow()
         meeting.status = "done"
 
         
-        try:
-            current_devices = json.loads(meeting.devices_used) if meeting.devices_used else {}
-        except Exception:
-            current_devices = {}
-        if isinstance(info, dict) and info.get("sys_backend"):
-            current_devices["sys_backend"] = info.get("sys_backend")
-            meeting.devices_used = json.dumps(current_devices, ensure_ascii=False)
-        meeting = repo_m.update(meeting)
+        if info.get("sys_backend"):
+            # Assign a new dict so the JSON column is flagged dirty
+            meeting.devices_used = {**(meeting.devices_used or {}), "sys_backend": info["sys_backend"]}
+        # Meeting update and audio rows share one commit
+        meeting = repo_m.update(meeting, commit=False)
 
         
-        rate = info.get("rate") if isinstance(info, dict) else None
+        rate = info.get("rate")
+        audio_rows: List[AudioFile] = []
         
         # Mic audio (if exists)
-        mic_path = info.get("mic_path") if isinstance(info, dict) else None
+        mic_path = info.get("mic_path")
         if mic_path:
             try:
                 path_obj = Path(mic_path)
                 if path_obj.exists():
                     file_bytes = path_obj.stat().st_size
-                    mic_frames = info.get("mic_frames") if isinstance(info, dict) else None
+                    mic_frames = info.get("mic_frames")
                     duration_ms = int((mic_frames or 0) * 1000 / rate) if rate else 0
                     audio = AudioFile(
                         meeting_id=meeting.id,  # type: ignore[arg-type]
@@ -123,18 +121,18 @@ async def stop_meeting(meeting_id: int, session: Session = Depends(get_session))
                         duration_ms=duration_ms,
                         bytes=int(file_bytes),
                     )
-                    AudioFilesRepository(session).create(audio)
+                    audio_rows.append(audio)
             except Exception:
                 pass
         
         # System audio (if exists)
-        sys_path = info.get("sys_path") if isinstance(info, dict) else None
+        sys_path = info.get("sys_path")
         if sys_path:
             try:
                 path_obj = Path(sys_path)
                 if path_obj.exists():
                     file_bytes = path_obj.stat().st_size
-                    sys_frames = info.get("sys_frames") if isinstance(info, dict) else None
+                    sys_frames = info.get("sys_frames")
                     duration_ms = int((sys_frames or 0) * 1000 / rate) if rate else 0
                     audio = AudioFile(
                         meeting_id=meeting.id,  # type: ignore[arg-type]
@@ -145,16 +143,37 @@ async def stop_meeting(meeting_id: int, session: Session = Depends(get_session))
                         duration_ms=duration_ms,
                         bytes=int(file_bytes),
                     )
-                    AudioFilesRepository(session).create(audio)
+                    audio_rows.append(audio)
             except Exception:
                 pass
 
+        if audio_rows:
+            AudioFilesRepository(session).create_many(audio_rows, commit=False)
+        session.commit()
+
+
+@router.post("/{meeting_id}/stop")
+async def stop_meeting(meeting_id: int) -> StopResponse:
+    
+    info = {}
+    if stop_recording:
+        try:
+            # Drains the track writers (resampling any backlog, joining threads)
+            info = await asyncio.to_thread(stop_recording, str(meeting_id))
+        except Exception:
+            info = {}
+    if not isinstance(info, dict):
+        info = {}
+
+    # Stat + DB bookkeeping off the event loop thread
+    await asyncio.to_thread(_persist_stop_metadata, meeting_id, info)
+
     return StopResponse(
         ok=True,
-        frames=info.get("frames") if isinstance(info, dict) else None,
-        rate=info.get("rate") if isinstance(info, dict) else None,
-        channels=info.get("channels") if isinstance(info, dict) else None,
-        sys_backend=info.get("sys_backend") if isinstance(info, dict) else None,
+        frames=info.get("frames"),
+        rate=info.get("rate"),
+        channels=info.get("channels"),
+        sys_backend=info.get("sys_backend"),
     )
 
 
@@ -165,23 +184,16 @@ def list_meetings(limit: int = 50, offset: int = 0, session: Session = Depends(g
 
 @router.get("/{meeting_id}")
 def get_meeting_detail(meeting_id: int, session: Session = Depends(get_session)) -> Dict[str, Any]:
-    repo_m = MeetingsRepository(session)
-    meeting = repo_m.get(meeting_id)
+    meeting = MeetingsRepository(session).get_with_children(meeting_id)
     if meeting is None:
         raise HTTPException(status_code=404, detail="Meeting not found")
-    audio_files = AudioFilesRepository(session).list_by_meeting(meeting_id)
-    segments = TranscriptsRepository(session).list_by_meeting(meeting_id)
-    
-    # Load summary if present
-    from app.repositories.summaries import SummariesRepository
-    summary = SummariesRepository(session).get_by_meeting(meeting_id)
     action_items = []
     
     return {
         "meeting": meeting,
-        "audio_files": audio_files,
-        "transcript_segments": segments,
-        "summary": summary,
+        "audio_files": meeting.audio_files,
+        "transcript_segments": meeting.transcript_segments,
+        "summary": meeting.summary,
         "action_items": action_items,
     }
 
@@ -191,6 +203,7 @@ class TranscribeRequest(BaseModel):
     language: str | None = None
     mode: str | None = None  # fast|accurate
     device: str | None = None  # auto|cpu|cuda
+    force: bool = False  # ignore stored results and transcribe again
 
 
 class TranscribeStatus(BaseModel):
@@ -214,6 +227,8 @@ def transcribe_meeting(meeting_id: int, body: TranscribeRequest, session: Sessio
         cfg["mode"] = body.mode
     if body.device in {"auto", "cpu", "cuda"}:
         cfg["device"] = body.device
+    if body.force:
+        cfg["force"] = True
 
     st = start_transcription_job(meeting_id, session, cfg_dict=cfg)
     return TranscribeStatus(status=st.status, progress=st.progress, message=st.message)
@@ -225,6 +240,11 @@ def transcription_status(meeting_id: int) -> TranscribeStatus:
     return TranscribeStatus(status=st.status, progress=st.progress, message=st.message)
 
 
+# Generation budget per summary length; unknown lengths fall back to "short"
+TOKEN_MAP: Dict[str, int] = {"short": 4096, "mid": 8192, "long": 16384}
+LLM_CFGS: Dict[str, LlmConfig] = {k: LlmConfig(max_tokens=v) for k, v in TOKEN_MAP.items()}
+
+
 class SummarizeResponse(BaseModel):
     ok: bool
 
@@ -241,9 +261,7 @@ def summarize_endpoint(meeting_id: int, body: SummarizeRequest | None = None, se
         raise HTTPException(status_code=404, detail="Meeting not found")
     
     length = (body.length if body else None) or "mid"
-    token_map: Dict[str, int] = {"short": 4096, "mid": 8192, "long": 16384}
-    max_tokens = token_map.get(length, 4096)
-    cfg = LlmConfig(max_tokens=max_tokens)
+    cfg = LLM_CFGS.get(length, LLM_CFGS["short"])
     result = summarize_meeting(meeting_id, session, cfg=cfg, length=length)
     return {"ok": True, **result}
 
@@ -1,7 +1,12 @@
 from __future__ import annotations
 
-from typing import Any, Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, TypeVar
+import asyncio
+import functools
 import shutil
+import threading
+import time
 
 from fastapi import APIRouter, Depends
 from pydantic import BaseModel
@@ -17,16 +22,73 @@ from app.services.model_manager import get_llm_presets, get_download_state, down
 from app.services.asr_model_manager import (
     get_asr_presets,
     get_asr_download_state,
+    begin_asr_download,
+    fail_asr_download,
     download_asr_preset,
     is_asr_model_present,
 )
 from app.services.cuda_runtime_manager import get_cuda_manager
+from app.services.transcription_service import asr_cache_dir
 from pathlib import Path
 import os
 
+try:
+    from llama_cpp import llama_supports_gpu_offload  # type: ignore
+except Exception:  # pragma: no cover
+    llama_supports_gpu_offload = None  # type: ignore
+
 
 router = APIRouter(prefix="/settings", tags=["settings"])
 
+settings = Settings()
+
+T = TypeVar("T")
+
+# Single long-lived worker for CUDA runtime downloads; the manager rejects concurrent runs anyway
+_cuda_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cuda-dl")
+# Same for ASR model downloads, which would otherwise hold an anyio worker for minutes
+_asr_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="asr-dl")
+
+
+def _ttl_cache(ttl_s: float) -> Callable[[Callable[[], T]], Callable[[], T]]:
+    """Memoize a zero-arg status getter for ttl_s; concurrent pollers share one call."""
+
+    def decorator(fn: Callable[[], T]) -> Callable[[], T]:
+        lock = threading.Lock()
+        cached: list[Any] = [0.0, None]  # [expiry, value]
+
+        @functools.wraps(fn)
+        def wrapper() -> T:
+            with lock:
+                now = time.monotonic()
+                if now >= cached[0]:
+                    cached[1] = fn()
+                    cached[0] = now + ttl_s
+                return cached[1]
+
+        return wrapper
+
+    return decorator
+
+
+# UI polls download/runtime status frequently; collapse bursts onto a single backend read
+_STATUS_TTL_S = 0.2
+
+
+@_ttl_cache(_STATUS_TTL_S)
+def _llm_download_state_cached() -> Dict[str, object]:
+    return get_download_state()
+
+
+@_ttl_cache(_STATUS_TTL_S)
+def _asr_download_state_cached() -> Dict[str, object]:
+    return get_asr_download_state()
+
+
+@_ttl_cache(_STATUS_TTL_S)
+def _cuda_status_cached() -> Dict[str, Any]:
+    return get_cuda_manager().get_status()
+
 
 class SettingsUpdate(BaseModel):
     asr: ASRSettings | None = None
@@ -55,8 +117,13 @@ class WipeRequest(BaseModel):
 
 
 @router.post("/wipe")
-def wipe_data(body: WipeRequest) -> Dict[str, Any]:
-    settings = Settings()
+async def wipe_data(body: WipeRequest) -> Dict[str, Any]:
+    # rmtree of the audio dir can take seconds; run on asyncio's executor instead of
+    # pinning one of the request threadpool workers
+    return await asyncio.to_thread(_wipe_data, body)
+
+
+def _wipe_data(body: WipeRequest) -> Dict[str, Any]:
     result: Dict[str, Any] = {"ok": False, "wiped_db": False, "wiped_audio": False}
 
     if body.wipe_audio:
@@ -66,6 +133,10 @@ def wipe_data(body: WipeRequest) -> Dict[str, Any]:
         except Exception:
             result["wiped_audio"] = False
 
+    if body.wipe_audio or body.wipe_db:
+        # Cached transcripts would outlive both the recordings and the database
+        shutil.rmtree(asr_cache_dir(settings), ignore_errors=True)
+
     if body.wipe_db:
         # Ensure no open connections hold the file
         try:
@@ -122,46 +193,69 @@ class LlmPreset(BaseModel):
     filename: str
 
 
+class LlmModelFile(BaseModel):
+    path: str
+    size: int
+
+
 class LlmOptions(BaseModel):
     gpu_available: bool
     models: list[str]
     presets: list[LlmPreset]
+    model_files: list[LlmModelFile] = []
 
 
-@router.get("/llm/options")
-def llm_options() -> LlmOptions:
-    # Probe GPU availability for llama-cpp-python (v0.3+)
-    gpu_available = False
+def _scan_gguf(path: str, out: list[Dict[str, Any]]) -> None:
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                _scan_gguf(entry.path, out)
+            elif entry.name.lower().endswith(".gguf") and entry.is_file():
+                # DirEntry.stat() is served from the directory listing on Windows
+                out.append({"path": entry.path, "size": entry.stat().st_size})
+
+
+def _list_gguf_models(models_dir: Path) -> list[Dict[str, Any]]:
+    # Walked on every call: the tree is small, and a directory mtime only reflects direct
+    # children, so it cannot tell whether a nested folder gained or lost a model
+    files: list[Dict[str, Any]] = []
     try:
-        from llama_cpp import llama_supports_gpu_offload  # type: ignore
+        _scan_gguf(str(models_dir), files)
+    except Exception:
+        return []
+    files.sort(key=lambda f: f["path"])
+    return files
 
-        gpu_available = bool(llama_supports_gpu_offload())
+
+@functools.lru_cache(maxsize=1)
+def _gpu_available() -> bool:
+    # Probe GPU availability for llama-cpp-python (v0.3+)
+    if llama_supports_gpu_offload is None:
+        return False
+    try:
+        return bool(llama_supports_gpu_offload())
     except Exception:
-        gpu_available = False
+        return False
 
-    # List GGUF files under default models directory
-    from app.config import Settings as AppSettings
 
-    settings = AppSettings()
+@router.get("/llm/options")
+def llm_options() -> LlmOptions:
+    gpu_available = _gpu_available()
+
+    # List GGUF files under default models directory
     models_dir = settings.models_dir / "llm"
     try:
         models_dir.mkdir(parents=True, exist_ok=True)
     except Exception:
         pass
-    model_paths: list[str] = []
-    try:
-        for root, _, files in os.walk(models_dir):
-            for f in files:
-                if f.lower().endswith(".gguf"):
-                    model_paths.append(str(Path(root) / f))
-    except Exception:
-        model_paths = []
+    model_files = _list_gguf_models(models_dir)
 
     presets = get_llm_presets()
     return LlmOptions(
         gpu_available=gpu_available,
-        models=sorted(model_paths),
+        models=[f["path"] for f in model_files],
         presets=[LlmPreset(id=p.id, label=p.label, filename=p.filename) for p in presets],
+        model_files=[LlmModelFile(**f) for f in model_files],
     )
 
 
@@ -216,7 +310,7 @@ def llm_download(body: LlmDownloadRequest) -> LlmDownloadResponse:
 
 @router.get("/llm/download/status")
 def llm_download_status() -> LlmDownloadResponse:
-    state = get_download_state()
+    state = _llm_download_state_cached()
     return LlmDownloadResponse(
         status=str(state.get("status")),
         progress=float(state.get("progress", 0.0)),
@@ -268,8 +362,19 @@ class AsrDownloadResponse(BaseModel):
     path: str | None = None
 
 
+def _run_asr_download(preset_id: str) -> None:
+    try:
+        download_asr_preset(preset_id)
+    except Exception:
+        # state is updated by the download call on error
+        pass
+
+
 @router.post("/asr/download")
-def asr_download(body: AsrDownloadRequest, session: Session = Depends(get_session)) -> AsrDownloadResponse:
+def asr_download(
+    body: AsrDownloadRequest,
+    session: Session = Depends(get_session),
+) -> AsrDownloadResponse:
     # Choose preset id
     preset_id = body.preset_id
     if not preset_id:
@@ -277,8 +382,10 @@ def asr_download(body: AsrDownloadRequest, session: Session = Depends(get_sessio
         asr_cfg = settings_dict.get("asr", {}) if isinstance(settings_dict, dict) else {}
         preset_id = str(asr_cfg.get("model_id", "large-v3"))
 
-    state = get_asr_download_state()
-    if state.get("status") == "running":
+    # Claim the state before returning, so the response (and the next status poll)
+    # already reports the download instead of the previous state
+    if not begin_asr_download(str(preset_id)):
+        state = get_asr_download_state()
         return AsrDownloadResponse(
             status=str(state.get("status")),
             progress=float(state.get("progress", 0.0)),
@@ -288,17 +395,7 @@ def asr_download(body: AsrDownloadRequest, session: Session = Depends(get_sessio
 
     # Start download in background and return immediately
     try:
-        import threading
-
-        def _bg() -> None:
-            try:
-                download_asr_preset(str(preset_id))
-            except Exception:
-                # state is updated by the download call on error
-                pass
-
-        t = threading.Thread(target=_bg, daemon=True)
-        t.start()
+        _asr_executor.submit(_run_asr_download, str(preset_id))
         state = get_asr_download_state()
         return AsrDownloadResponse(
             status=str(state.get("status")),
@@ -307,6 +404,7 @@ def asr_download(body: AsrDownloadRequest, session: Session = Depends(get_sessio
             path=str(state.get("path")) if state.get("path") else None,
         )
     except Exception as e:
+        fail_asr_download(str(e))
         state = get_asr_download_state()
         return AsrDownloadResponse(
             status="error",
@@ -318,7 +416,7 @@ def asr_download(body: AsrDownloadRequest, session: Session = Depends(get_sessio
 
 @router.get("/asr/download/status")
 def asr_download_status() -> AsrDownloadResponse:
-    state = get_asr_download_state()
+    state = _asr_download_state_cached()
     return AsrDownloadResponse(
         status=str(state.get("status")),
         progress=float(state.get("progress", 0.0)),
@@ -344,8 +442,7 @@ class CudaStatus(BaseModel):
 @router.get("/cuda/status")
 def cuda_status() -> CudaStatus:
     """Get current CUDA runtime status."""
-    cuda_mgr = get_cuda_manager()
-    status = cuda_mgr.get_status()
+    status = _cuda_status_cached()
     return CudaStatus(**status)
 
 
@@ -377,13 +474,12 @@ def cuda_download(body: CudaDownloadRequest) -> CudaDownloadResponse:
     download_size = cuda_mgr.get_download_size(missing)
     
     # Start download in background
-    import threading
-    
     def _download():
         cuda_mgr.download_libraries(missing)
+        # CUDA runtime availability may have changed
+        _gpu_available.cache_clear()
     
-    thread = threading.Thread(target=_download, daemon=True)
-    thread.start()
+    _cuda_executor.submit(_download)
     
     return CudaDownloadResponse(
         success=True,
@@ -398,6 +494,7 @@ def cuda_cleanup() -> Dict[str, bool]:
     cuda_mgr = get_cuda_manager()
     try:
         cuda_mgr.cleanup_unused_libraries()
+        _gpu_available.cache_clear()
         return {"success": True}
     except Exception as e:
         return {"success": False, "error": str(e)}
@@ -19,6 +19,9 @@ class Settings(BaseSettings):
 
     database_path: Path = Field(default_factory=lambda: Path(os.getenv("APPDATA", "")) / "MeetingNotes" / "data" / "meeting_notes.db")
 
+    # Transcription jobs run at once; later ones wait in a queue (MN_ASR_WORKERS)
+    asr_workers: int = 1
+
     class Config:
         env_prefix = "MN_"
         case_sensitive = False
@@ -7,22 +7,22 @@ from __future__ import annotations
 
 import sys
 import os
+import hashlib
 import threading
 import time
 import socket
 from pathlib import Path
 from contextlib import closing
+from typing import TYPE_CHECKING
 import logging
 
-import uvicorn
-import webview
-from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
-
-from app.main import create_app
 from app.config import Settings
 
+# uvicorn, webview and the FastAPI app are imported where first used so that
+# settings/port setup does not wait on them at launch
+if TYPE_CHECKING:
+    from fastapi import FastAPI
+
 
 # Configure logging
 logging.basicConfig(
@@ -32,12 +32,16 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def find_free_port() -> int:
-    """Find a free port on localhost."""
-    with closing(socket.socket(socket.AF_INET, socket.SOCK_STREAM)) as s:
-        s.bind(('127.0.0.1', 0))
-        s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        return s.getsockname()[1]
+def reserve_free_port() -> socket.socket:
+    """Bind a socket to a free port on localhost and keep it for the server.
+
+    The socket is handed to uvicorn as-is, so no other process can take the port
+    between discovery and startup. It is not put into listening state here:
+    uvicorn does that once the app has started, which wait_for_server relies on.
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind(('127.0.0.1', 0))
+    return sock
 
 
 def get_frontend_path() -> Path:
@@ -61,30 +65,56 @@ def get_frontend_path() -> Path:
 
 def create_desktop_app() -> FastAPI:
     """Create the FastAPI app configured for desktop mode."""
+    from fastapi.responses import Response
+    from fastapi.staticfiles import StaticFiles
+    from starlette.datastructures import Headers
+    from starlette.exceptions import HTTPException as StarletteHTTPException
+
+    from app.main import create_app
+
     app = create_app()
     
     # Get frontend path
     frontend_path = get_frontend_path()
     logger.info(f"Serving frontend from: {frontend_path}")
     
+    # index.html is small and served on every navigation; keep it in memory
+    # (a rebuilt frontend is picked up on the next launch)
+    index_path = frontend_path / 'index.html'
+    index_bytes = index_path.read_bytes() if index_path.exists() else None
+    if index_bytes is None:
+        logger.warning(f"Frontend index not found at: {index_path}")
+    index_etag = f'"{hashlib.md5(index_bytes).hexdigest()}"' if index_bytes is not None else ""
+    index_headers = {"ETag": index_etag, "Cache-Control": "no-cache"}
+
+    def index_response(scope) -> Response:
+        if Headers(scope=scope).get("if-none-match") == index_etag:
+            return Response(status_code=304, headers=index_headers)
+        return Response(content=index_bytes, media_type="text/html", headers=index_headers)
+
+    class SPAStaticFiles(StaticFiles):
+        """StaticFiles that falls back to index.html for client-side routes."""
+
+        async def get_response(self, path: str, scope):  # type: ignore[override]
+            if index_bytes is not None and path in (".", "index.html"):
+                return index_response(scope)
+            try:
+                return await super().get_response(path, scope)
+            except StarletteHTTPException as exc:
+                # Registered API routes match before this mount; unknown API-style paths
+                # (a typo'd /api/... call) keep their 404 instead of getting the SPA page
+                if exc.status_code != 404 or index_bytes is None or path.startswith(("api/", "ws/", "healthz")):
+                    raise
+                return index_response(scope)
+    
     # Mount static files for assets
     assets_path = frontend_path / 'assets'
     if assets_path.exists():
         app.mount("/assets", StaticFiles(directory=str(assets_path)), name="assets")
     
-    # Serve index.html for all other routes (SPA support)
-    @app.get("/{full_path:path}")
-    async def serve_spa(full_path: str):
-        # Skip API routes
-        if full_path.startswith(("api/", "ws/", "healthz")):
-            return {"error": "Not Found"}, 404
-        
-        # Serve index.html for all other routes
-        index_path = frontend_path / 'index.html'
-        if index_path.exists():
-            return FileResponse(str(index_path))
-        else:
-            return {"error": "Frontend not found"}, 404
+    # Serve index.html for all other routes (SPA support). Mounted last so the
+    # API routers registered by create_app() match first.
+    app.mount("/", SPAStaticFiles(directory=str(frontend_path), html=True), name="spa")
     
     return app
 
@@ -92,50 +122,57 @@ def create_desktop_app() -> FastAPI:
 class ServerThread(threading.Thread):
     """Thread to run the FastAPI server."""
     
-    def __init__(self, app: FastAPI, port: int):
+    def __init__(self, app: FastAPI, sock: socket.socket):
         super().__init__(daemon=True)
         self.app = app
-        self.port = port
+        self.sock = sock
+        self.port = sock.getsockname()[1]
         self.server = None
-        self._stop_event = threading.Event()
     
     def run(self):
         """Run the server."""
+        import uvicorn
+
         config = uvicorn.Config(
             app=self.app,
             host="127.0.0.1",
             port=self.port,
+            # uvloop is POSIX-only; httptools ships wheels for all platforms
+            loop="asyncio" if sys.platform == "win32" else "uvloop",
+            http="httptools",
+            interface="asgi3",
+            lifespan="on",
             log_level="info",
+            log_config=None,  # Keep the root logging config from basicConfig above
             access_log=False  # Reduce console spam
         )
         self.server = uvicorn.Server(config)
         
         logger.info(f"Starting backend server on http://127.0.0.1:{self.port}")
-        self.server.run()
+        # Pass the pre-bound socket directly; Config(fd=...) assumes AF_UNIX and is POSIX-only
+        self.server.run(sockets=[self.sock])
     
     def stop(self):
         """Stop the server."""
         if self.server:
             logger.info("Stopping backend server...")
             self.server.should_exit = True
-            self._stop_event.set()
+            # The window is already gone; don't wait on keep-alive connections to drain
+            self.server.force_exit = True
 
 
 def wait_for_server(port: int, timeout: float = 10.0) -> bool:
     """Wait for the server to be ready."""
-    import requests
-    
+    # uvicorn starts listening only after lifespan startup, so an accepted
+    # TCP connect is enough; no HTTP client needed.
     start_time = time.time()
-    url = f"http://127.0.0.1:{port}/healthz"
     
     while time.time() - start_time < timeout:
-        try:
-            response = requests.get(url, timeout=1)
-            if response.status_code == 200:
+        with closing(socket.socket(socket.AF_INET, socket.SOCK_STREAM)) as s:
+            s.settimeout(0.2)
+            if s.connect_ex(('127.0.0.1', port)) == 0:
                 logger.info("Backend server is ready")
                 return True
-        except:
-            pass
         time.sleep(0.1)
     
     return False
@@ -143,19 +180,22 @@ def wait_for_server(port: int, timeout: float = 10.0) -> bool:
 
 def main():
     """Main entry point for the desktop application."""
+    import webview
+
     # Ensure settings directories exist
     settings = Settings()
     settings.ensure_dirs()
     
-    # Find a free port
-    port = find_free_port()
+    # Reserve a free port
+    sock = reserve_free_port()
+    port = sock.getsockname()[1]
     logger.info(f"Using port {port} for backend server")
     
     # Create the app
     app = create_desktop_app()
     
     # Start the server in a background thread
-    server_thread = ServerThread(app, port)
+    server_thread = ServerThread(app, sock)
     server_thread.start()
     
     # Wait for server to be ready
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 import logging
 from logging.handlers import RotatingFileHandler
 
@@ -18,7 +18,11 @@ settings = Settings()
 
 
 def create_app() -> FastAPI:
-    app = FastAPI(title="Meeting Notes Backend", version="0.1.0")
+    app = FastAPI(
+        title="Meeting Notes Backend",
+        version="0.1.0",
+        default_response_class=ORJSONResponse,
+    )
 
     # CORS for local dev and Tauri
     app.add_middleware(
@@ -8,6 +8,8 @@ class ASRSettings(BaseModel):
     """Settings for local ASR using faster-whisper."""
 
     # Whisper model id; we constrain to public identifiers supported by faster-whisper.
+    # distil-large-v3 decodes several times faster than large-v3 but only transcribes
+    # English, so it is opt-in while language auto-detection is the default.
     model_id: Literal[
         "tiny",
         "base",
@@ -49,7 +51,7 @@ class AppSettingsModel(BaseModel):
 
     def to_dict(self) -> Dict[str, Any]:
         # Keep compatibility with current API shape
-        return self.dict()
+        return self.model_dump(mode="python")
 
 
 def deep_merge_dict(dst: Dict[str, Any], src: Dict[str, Any]) -> Dict[str, Any]:
@@ -61,6 +63,21 @@ def deep_merge_dict(dst: Dict[str, Any], src: Dict[str, Any]) -> Dict[str, Any]:
     return dst
 
 
+def merge_settings_dict(dst: Dict[str, Any], src: Dict[str, Any]) -> Dict[str, Any]:
+    """Merge a settings patch into a full settings dict.
+
+    Specialized to the AppSettingsModel schema, whose nested sections ("asr", "llm")
+    are flat, so a per-section dict unpack replaces the recursive deep merge.
+    """
+    merged = {**dst, **src}
+    for section in ("asr", "llm"):
+        base = dst.get(section)
+        patch = src.get(section)
+        if isinstance(base, dict) and isinstance(patch, dict):
+            merged[section] = {**base, **patch}
+    return merged
+
+
 def migrate_settings_dict(raw: Dict[str, Any]) -> Dict[str, Any]:
     """Migrate arbitrary settings payload to the supported structure.
 
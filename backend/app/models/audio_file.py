@@ -1,12 +1,16 @@
 from __future__ import annotations
 
 from typing import Optional
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field
 
 
 class AudioFile(SQLModel, table=True):
+    # Covers get_by_meeting_and_kind and, via its leftmost column, list_by_meeting
+    __table_args__ = (Index("ix_audiofile_meeting_kind", "meeting_id", "kind"),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
-    meeting_id: int = Field(index=True, foreign_key="meeting.id")
+    meeting_id: int = Field(foreign_key="meeting.id")
     kind: str  # mic|system
     path: str
     codec: str
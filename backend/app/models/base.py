@@ -1,22 +1,56 @@
 from __future__ import annotations
 
+from datetime import datetime, timezone
+
+from sqlalchemy import event
 from sqlmodel import SQLModel, create_engine
 from sqlalchemy.engine import Engine
 from app.config import Settings
 
 _settings = Settings()
 
-# SQLite with WAL enabled
+# SQLite with WAL enabled. The default QueuePool keeps connections open across requests;
+# a StaticPool would share one connection (and its transaction) between API and worker threads.
 engine: Engine = create_engine(
     f"sqlite:///{_settings.database_path}", connect_args={"check_same_thread": False}
 )
 
 
-def init_db() -> None:
-    # Enable WAL
-    with engine.begin() as conn:
-        conn.exec_driver_sql("PRAGMA journal_mode=WAL;")
-        conn.exec_driver_sql("PRAGMA synchronous=NORMAL;")
-    SQLModel.metadata.create_all(engine)
+@event.listens_for(engine, "connect")
+def _set_sqlite_pragmas(dbapi_conn, _connection_record) -> None:  # noqa: ANN001 - DBAPI hook
+    # synchronous/temp_store/mmap_size are per-connection, so apply them to every pooled connection
+    cursor = dbapi_conn.cursor()
+    try:
+        cursor.execute("PRAGMA journal_mode=WAL;")
+        cursor.execute("PRAGMA synchronous=NORMAL;")
+        cursor.execute("PRAGMA temp_store=MEMORY;")
+        cursor.execute("PRAGMA mmap_size=268435456;")
+        cursor.execute("PRAGMA cache_size=-65536;")  # 64 MiB page cache
+        cursor.execute("PRAGMA busy_timeout=5000;")
+        cursor.execute("PRAGMA foreign_keys=ON;")
+    finally:
+        cursor.close()
+
+
+def utcnow() -> datetime:
+    """Naive UTC timestamp, as stored in the existing datetime columns (datetime.utcnow is deprecated)."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
 
 
+# Single-column indexes replaced by the composite ones on TranscriptSegment / AudioFile
+_SUPERSEDED_INDEXES = (
+    "ix_transcriptsegment_meeting_id",
+    "ix_transcriptsegment_t_start_ms",
+    "ix_audiofile_meeting_id",
+)
+
+
+def init_db() -> None:
+    SQLModel.metadata.create_all(engine)
+    # create_all skips tables that already exist, including their indexes; bring older databases up to date
+    with engine.begin() as conn:
+        for table in SQLModel.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+        for name in _SUPERSEDED_INDEXES:
+            conn.exec_driver_sql(f"DROP INDEX IF EXISTS {name}")
@@ -1,17 +1,33 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Optional
-from sqlmodel import SQLModel, Field
+from typing import Any, Dict, List, Optional
+from sqlalchemy import JSON, Column
+from sqlalchemy.orm import relationship
+from sqlmodel import SQLModel, Field, Relationship
+
+from app.models.audio_file import AudioFile
+from app.models.base import utcnow
+from app.models.summary import Summary
+from app.models.transcript_segment import TranscriptSegment
 
 
 class Meeting(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     title: str = Field(default="Untitled Meeting")
-    started_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+    started_at: datetime = Field(default_factory=utcnow, index=True)
     ended_at: Optional[datetime] = None
     language: Optional[str] = None
-    devices_used: Optional[str] = None  # JSON string
+    devices_used: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSON))
     status: str = Field(default="recording")  # recording|processing|done
 
-
+    # Read-only views used to eager-load the detail page; children are written via their repositories
+    audio_files: List[AudioFile] = Relationship(
+        sa_relationship=relationship(AudioFile, order_by=AudioFile.id, viewonly=True)
+    )
+    transcript_segments: List[TranscriptSegment] = Relationship(
+        sa_relationship=relationship(TranscriptSegment, order_by=TranscriptSegment.t_start_ms, viewonly=True)
+    )
+    summary: Optional[Summary] = Relationship(
+        sa_relationship=relationship(Summary, uselist=False, viewonly=True)
+    )
@@ -1,13 +1,17 @@
 from __future__ import annotations
 
 from typing import Optional
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field
 
 
 class TranscriptSegment(SQLModel, table=True):
+    # Matches list_by_meeting: filter on meeting_id, ordered by t_start_ms
+    __table_args__ = (Index("ix_segment_meeting_start", "meeting_id", "t_start_ms"),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
-    meeting_id: int = Field(index=True, foreign_key="meeting.id")
-    t_start_ms: int = Field(index=True)
+    meeting_id: int = Field(foreign_key="meeting.id")
+    t_start_ms: int
     t_end_ms: int
     speaker: str  # "You" | "Remote" | other
     text: str
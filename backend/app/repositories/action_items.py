@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from typing import Iterable, List
+from sqlalchemy import delete
 from sqlmodel import Session, select
 
 from app.models.action_item import ActionItem
@@ -11,17 +12,13 @@ class ActionItemsRepository:
         self.session = session
 
     def upsert_many_for_meeting(self, meeting_id: int, items: Iterable[ActionItem]) -> List[ActionItem]:
-        # Simple approach: delete existing then insert
-        existing = self.list_by_meeting(meeting_id)
-        for item in existing:
-            self.session.delete(item)
-        self.session.commit()
+        # Simple approach: delete existing then insert, as one DELETE plus one batched INSERT
+        self.session.exec(delete(ActionItem).where(ActionItem.meeting_id == meeting_id))  # type: ignore[call-overload]
 
-        saved: List[ActionItem] = []
-        for item in items:
+        saved: List[ActionItem] = list(items)
+        for item in saved:
             item.meeting_id = meeting_id
-            self.session.add(item)
-            saved.append(item)
+        self.session.add_all(saved)
         self.session.commit()
         for item in saved:
             self.session.refresh(item)
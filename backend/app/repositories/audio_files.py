@@ -11,11 +11,19 @@ class AudioFilesRepository:
     def __init__(self, session: Session) -> None:
         self.session = session
 
-    def create(self, audio_file: AudioFile) -> AudioFile:
-        self.session.add(audio_file)
+    def create(self, audio_file: AudioFile, commit: bool = True) -> AudioFile:
+        return self.create_many([audio_file], commit=commit)[0]
+
+    def create_many(self, audio_files: List[AudioFile], commit: bool = True) -> List[AudioFile]:
+        # One transaction (and one fsync) for all tracks of a recording
+        self.session.add_all(audio_files)
+        if not commit:
+            self.session.flush()
+            return audio_files
         self.session.commit()
-        self.session.refresh(audio_file)
-        return audio_file
+        for audio_file in audio_files:
+            self.session.refresh(audio_file)
+        return audio_files
 
     def list_by_meeting(self, meeting_id: int) -> list[AudioFile]:
         statement = select(AudioFile).where(AudioFile.meeting_id == meeting_id).order_by(AudioFile.id.asc())
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from typing import Optional
+from sqlalchemy.orm import joinedload, selectinload
 from sqlmodel import Session, select
 
 from app.models.meeting import Meeting
@@ -10,23 +11,43 @@ class MeetingsRepository:
     def __init__(self, session: Session) -> None:
         self.session = session
 
-    def create(self, meeting: Meeting) -> Meeting:
+    def create(self, meeting: Meeting, commit: bool = True) -> Meeting:
         self.session.add(meeting)
-        self.session.commit()
-        self.session.refresh(meeting)
+        self._persist(meeting, commit)
         return meeting
 
     def get(self, meeting_id: int) -> Optional[Meeting]:
         return self.session.get(Meeting, meeting_id)
 
+    def get_with_children(self, meeting_id: int) -> Optional[Meeting]:
+        """Load a meeting with its audio files, transcript segments and summary in one call."""
+        statement = (
+            select(Meeting)
+            .where(Meeting.id == meeting_id)
+            .options(
+                joinedload(Meeting.summary),
+                selectinload(Meeting.audio_files),
+                selectinload(Meeting.transcript_segments),
+            )
+        )
+        return self.session.exec(statement).first()
+
     def list(self, limit: int = 50, offset: int = 0) -> list[Meeting]:
         statement = select(Meeting).order_by(Meeting.started_at.desc()).limit(limit).offset(offset)
         return list(self.session.exec(statement))
 
-    def update(self, meeting: Meeting) -> Meeting:
+    def update(self, meeting: Meeting, commit: bool = True) -> Meeting:
         self.session.add(meeting)
-        self.session.commit()
-        self.session.refresh(meeting)
+        self._persist(meeting, commit)
         return meeting
 
+    def _persist(self, meeting: Meeting, commit: bool) -> None:
+        # commit=False lets the caller group several writes into one transaction (one fsync);
+        # flush still assigns the primary key and nothing is expired, so no refresh is needed
+        if commit:
+            self.session.commit()
+            self.session.refresh(meeting)
+        else:
+            self.session.flush()
+
 
@@ -1,15 +1,17 @@
 from __future__ import annotations
 
 from typing import Any, Dict, Optional
-import json
+import copy
 
+import orjson
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlmodel import Session, select
 
 from app.models.setting import Setting
 from app.models.app_settings import (
     AppSettingsModel,
     migrate_settings_dict,
-    deep_merge_dict,
+    merge_settings_dict,
 )
 
 
@@ -18,48 +20,58 @@ DEFAULT_SETTINGS: Dict[str, Any] = AppSettingsModel().to_dict()
 
 APP_SETTINGS_KEY = "app_settings"
 
+# (value_json, normalized dict) of the last load/save; skips migrate + validate when unchanged
+_CACHE: Optional[tuple[Optional[str], Dict[str, Any]]] = None
+
 
 def _load_json_or_default(value_json: Optional[str]) -> Dict[str, Any]:
     if not value_json:
-        return json.loads(json.dumps(DEFAULT_SETTINGS))
+        return copy.deepcopy(DEFAULT_SETTINGS)
     try:
-        parsed = json.loads(value_json)
+        parsed = orjson.loads(value_json)
         # migrate legacy keys
         migrated = migrate_settings_dict(parsed)
-        # deep-merge defaults to ensure new fields exist
-        merged: Dict[str, Any] = json.loads(json.dumps(DEFAULT_SETTINGS))
-        merged = deep_merge_dict(merged, migrated)
+        # merge over defaults to ensure new fields exist (returns new dicts; defaults untouched)
+        merged = merge_settings_dict(DEFAULT_SETTINGS, migrated)
         # validate with Pydantic to coerce and ensure types
         model = AppSettingsModel(**merged)
         return model.to_dict()
     except Exception:
-        return json.loads(json.dumps(DEFAULT_SETTINGS))
+        return copy.deepcopy(DEFAULT_SETTINGS)
 
 
 def get_app_settings(session: Session) -> Dict[str, Any]:
-    stmt = select(Setting).where(Setting.key == APP_SETTINGS_KEY)
-    row = session.exec(stmt).first()
-    return _load_json_or_default(row.value_json if row else None)
+    global _CACHE
+    stmt = select(Setting.value_json).where(Setting.key == APP_SETTINGS_KEY)
+    value_json = session.exec(stmt).first()
+    cached = _CACHE
+    if cached is not None and cached[0] == value_json:
+        return copy.deepcopy(cached[1])
+    loaded = _load_json_or_default(value_json)
+    _CACHE = (value_json, loaded)
+    return copy.deepcopy(loaded)
 
 
 def save_app_settings(session: Session, settings_data: Dict[str, Any]) -> Dict[str, Any]:
+    global _CACHE
     # Merge with existing to avoid losing unknown fields
     current = get_app_settings(session)
     # migrate input patch too
     incoming = migrate_settings_dict(settings_data)
-    merged = deep_merge_dict(current, incoming)
+    merged = merge_settings_dict(current, incoming)
     # validate and normalize via Pydantic
     model = AppSettingsModel(**merged)
     normalized = model.to_dict()
-    payload = json.dumps(normalized, ensure_ascii=False)
-    stmt = select(Setting).where(Setting.key == APP_SETTINGS_KEY)
-    row = session.exec(stmt).first()
-    if row is None:
-        row = Setting(key=APP_SETTINGS_KEY, value_json=payload)
-        session.add(row)
-    else:
-        row.value_json = payload
+    payload = orjson.dumps(normalized).decode()
+    # Single INSERT ... ON CONFLICT(key) DO UPDATE instead of SELECT then write
+    stmt = (
+        sqlite_insert(Setting)
+        .values(key=APP_SETTINGS_KEY, value_json=payload)
+        .on_conflict_do_update(index_elements=[Setting.key], set_={"value_json": payload})
+    )
+    session.exec(stmt)  # type: ignore[call-overload]
     session.commit()
+    _CACHE = (payload, copy.deepcopy(normalized))
     return normalized
 
 
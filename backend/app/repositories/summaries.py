@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from typing import Optional
+from sqlalchemy import update
 from sqlmodel import Session, select
 
 from app.models.summary import Summary
@@ -10,20 +11,24 @@ class SummariesRepository:
     def __init__(self, session: Session) -> None:
         self.session = session
 
-    def upsert_for_meeting(self, meeting_id: int, abstract_md: str, bullets_md: str) -> Summary:
-        existing = self.get_by_meeting(meeting_id)
-        if existing is None:
+    def upsert_for_meeting(self, meeting_id: int, abstract_md: str, bullets_md: str, commit: bool = True) -> Summary:
+        # Update first; UPDATE ... RETURNING hands back the row without a prior SELECT
+        statement = (
+            update(Summary)
+            .where(Summary.meeting_id == meeting_id)
+            .values(abstract_md=abstract_md, bullets_md=bullets_md)
+            .returning(Summary)
+        )
+        summary = self.session.exec(statement).scalars().first()  # type: ignore[call-overload]
+        if summary is None:
             summary = Summary(meeting_id=meeting_id, abstract_md=abstract_md, bullets_md=bullets_md)
             self.session.add(summary)
-            self.session.commit()
-            self.session.refresh(summary)
+        if not commit:
+            self.session.flush()
             return summary
-        existing.abstract_md = abstract_md
-        existing.bullets_md = bullets_md
-        self.session.add(existing)
         self.session.commit()
-        self.session.refresh(existing)
-        return existing
+        self.session.refresh(summary)
+        return summary
 
     def get_by_meeting(self, meeting_id: int) -> Optional[Summary]:
         statement = select(Summary).where(Summary.meeting_id == meeting_id)
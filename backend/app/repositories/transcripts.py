@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from typing import Iterable
+from sqlalchemy import delete, func
 from sqlmodel import Session, select
 
 from app.models.transcript_segment import TranscriptSegment
@@ -11,22 +12,34 @@ class TranscriptsRepository:
         self.session = session
 
     def add_segments(self, segments: Iterable[TranscriptSegment]) -> None:
-        for seg in segments:
-            self.session.add(seg)
+        # Bulk executemany INSERT; skips per-row unit-of-work bookkeeping
+        rows = [seg.model_dump(exclude={"id"} if seg.id is None else None) for seg in segments]
+        if rows:
+            self.session.bulk_insert_mappings(TranscriptSegment, rows)
         self.session.commit()
 
+    def replace_segments(self, meeting_id: int, rows: list[dict], commit: bool = True) -> None:
+        """Replace all transcript segments of a meeting with the given column mappings.
+
+        The DELETE and the executemany INSERT run in one transaction; pass commit=False
+        to group further writes into it.
+        """
+        statement = delete(TranscriptSegment).where(TranscriptSegment.meeting_id == meeting_id)
+        self.session.exec(statement)  # type: ignore[call-overload]
+        if rows:
+            self.session.bulk_insert_mappings(TranscriptSegment, rows)
+        if commit:
+            self.session.commit()
+
     def delete_for_meeting(self, meeting_id: int) -> int:
         """Delete all transcript segments for a meeting.
 
-        Returns number of rows intended to be deleted. SQLite via ORM does not
-        easily return affected row count reliably here; we return a best-effort
-        number by querying first to keep things simple and clear.
+        Issues a single DELETE statement and returns the affected row count.
         """
-        to_delete = self.list_by_meeting(meeting_id)
-        for seg in to_delete:
-            self.session.delete(seg)
+        statement = delete(TranscriptSegment).where(TranscriptSegment.meeting_id == meeting_id)
+        result = self.session.exec(statement)  # type: ignore[call-overload]
         self.session.commit()
-        return len(to_delete)
+        return int(result.rowcount or 0)
 
     def list_by_meeting(self, meeting_id: int) -> list[TranscriptSegment]:
         statement = select(TranscriptSegment).where(TranscriptSegment.meeting_id == meeting_id).order_by(
@@ -35,7 +48,7 @@ class TranscriptsRepository:
         return list(self.session.exec(statement))
 
     def count_for_meeting(self, meeting_id: int) -> int:
-        # Simple count via list; acceptable for small datasets here.
-        return len(self.list_by_meeting(meeting_id))
-
-
+        statement = select(func.count()).select_from(TranscriptSegment).where(
+            TranscriptSegment.meeting_id == meeting_id
+        )
+        return int(self.session.exec(statement).one())
@@ -1,11 +1,19 @@
 from __future__ import annotations
 
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterable, List, Optional, Tuple, Callable
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Callable
 
+import gc
 import numpy as np
 import math
+import os
+import sys
+import threading
+import time
+import wave
 
 from app.config import Settings
 
@@ -17,6 +25,158 @@ class ASRConfig:
     mode: str = "fast"  # fast|accurate
     language: Optional[str] = None
     vad: bool = True
+    compute_type: Optional[str] = None  # None → fastest type supported by the device
+    batch_size: int = 16  # VAD chunks decoded per forward pass on CUDA (batched pipeline)
+
+
+# Fastest first; ctranslate2 reports which ones the current GPU/CPU can run
+_COMPUTE_TYPE_PREFERENCE: Dict[str, List[str]] = {
+    "cuda": ["int8_float16", "float16", "int8"],
+    "cpu": ["int8"],
+}
+_compute_type_cache: Dict[str, str] = {}
+
+
+def _pick_compute_type(device: str) -> str:
+    cached = _compute_type_cache.get(device)
+    if cached is not None:
+        return cached
+    chosen = "auto"
+    try:
+        import ctranslate2  # type: ignore
+
+        supported = set(ctranslate2.get_supported_compute_types(device))
+        for ct in _COMPUTE_TYPE_PREFERENCE.get(device, []):
+            if ct in supported:
+                chosen = ct
+                break
+    except Exception:
+        # Let CTranslate2 decide at load time
+        chosen = "auto"
+    _compute_type_cache[device] = chosen
+    return chosen
+
+
+# Whisper's encoder GEMMs stop scaling past ~8 threads (memory-bandwidth bound)
+_MAX_CPU_THREADS = 8
+
+
+def _cpu_threads() -> int:
+    return max(1, min(_MAX_CPU_THREADS, os.cpu_count() or 4))
+
+
+# Files decoded at once outside the batched CUDA path (a job's mic and system tracks)
+_CPU_PARALLEL_FILES = 2
+
+
+# Loaded WhisperModels shared by all engine instances, keyed by (model_id, device, compute_type).
+# Models are several GB, so only the most recently used one is kept.
+_MAX_CACHED_MODELS = 1
+_MODEL_REGISTRY: "OrderedDict[Tuple[str, str, str], Any]" = OrderedDict()
+_REGISTRY_LOCK = threading.Lock()
+
+
+# Minimum seconds between "decoding" progress callbacks (they often end in a WebSocket broadcast)
+_PROGRESS_INTERVAL_S = 0.1
+
+# Whisper's input rate; faster-whisper expects ndarray input at this rate, mono float32
+_WHISPER_SAMPLE_RATE = 16000
+
+
+def _wav_data_offset(path: Path) -> Optional[int]:
+    """Byte offset of the sample data in a RIFF/WAVE file, or None if there is none."""
+    with open(path, "rb") as f:
+        header = f.read(12)
+        if len(header) < 12 or header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+            return None
+        while True:
+            chunk = f.read(8)
+            if len(chunk) < 8:
+                return None
+            size = int.from_bytes(chunk[4:], "little")
+            if chunk[:4] == b"data":
+                return f.tell()
+            # Chunks are word-aligned
+            f.seek(size + (size & 1), os.SEEK_CUR)
+
+
+def _load_pcm16k(path: Path) -> Optional[np.ndarray]:
+    """Decode a PCM16 WAV (as written by audio_capture) to 16 kHz mono float32.
+
+    Samples are read through a memory map, so the only full-length buffer is the
+    float32 result. Returns None for anything else so the caller can fall back to
+    faster-whisper's own decoder.
+    """
+    try:
+        with wave.open(str(path), "rb") as wf:
+            if wf.getsampwidth() != 2:
+                return None
+            channels = wf.getnchannels()
+            rate = wf.getframerate()
+            nframes = wf.getnframes()
+        offset = _wav_data_offset(path)
+        if offset is None:
+            return None
+        # A recording cut short can leave a header promising more frames than exist
+        nframes = max(0, min(nframes, (os.path.getsize(path) - offset) // (2 * channels)))
+        if nframes == 0:
+            return np.zeros(0, dtype=np.float32)
+        pcm = np.memmap(path, dtype="<i2", mode="r", offset=offset, shape=(nframes * channels,))
+    except (wave.Error, EOFError, OSError, ValueError):
+        return None
+    if channels > 1:
+        # Downmix straight from the int16 samples; no full-width float copy
+        audio = pcm.reshape(-1, channels).mean(axis=1, dtype=np.float32)
+    else:
+        audio = pcm.astype(np.float32)
+    del pcm
+    audio *= 1.0 / 32768.0
+    if rate != _WHISPER_SAMPLE_RATE:
+        import soxr
+
+        audio = soxr.resample(audio, rate, _WHISPER_SAMPLE_RATE, quality="HQ")
+    return np.ascontiguousarray(audio, dtype=np.float32)
+
+
+_vad_accel_tried: set[str] = set()
+
+
+def _accelerate_vad(device: str) -> None:
+    """Move faster-whisper's Silero VAD ONNX sessions to CUDA (or CoreML on macOS).
+
+    faster-whisper always builds them with the CPU provider, so VAD stays single-threaded
+    on CPU even when decoding runs on the GPU. The CUDA provider needs onnxruntime-gpu,
+    which replaces (and conflicts with) the plain onnxruntime package; without it this
+    is a no-op. Best-effort: on any failure the CPU sessions are kept.
+    """
+    if device in _vad_accel_tried:
+        return
+    _vad_accel_tried.add(device)
+    try:
+        import onnxruntime as ort  # type: ignore
+        from faster_whisper import vad as fw_vad  # type: ignore
+
+        available = set(ort.get_available_providers())
+        if device == "cuda" and "CUDAExecutionProvider" in available:
+            providers = ["CUDAExecutionProvider", "CPUExecutionProvider"]
+        elif sys.platform == "darwin" and "CoreMLExecutionProvider" in available:
+            providers = ["CoreMLExecutionProvider", "CPUExecutionProvider"]
+        else:
+            return
+        vad_model = fw_vad.get_vad_model()  # cached by faster-whisper, shared by all calls
+        for name, sess in list(vars(vad_model).items()):
+            if not isinstance(sess, ort.InferenceSession):
+                continue
+            model_path = getattr(sess, "_model_path", None)
+            if not model_path:
+                continue
+            setattr(
+                vad_model,
+                name,
+                ort.InferenceSession(model_path, sess_options=getattr(sess, "_sess_options", None), providers=providers),
+            )
+    except Exception:
+        pass
 
 
 class WhisperASREngine:
@@ -26,8 +186,9 @@ class WhisperASREngine:
         self._settings = settings or Settings()
         self._cached_key: Optional[Tuple[str, str, str]] = None
         self._model = None
+        self._pipeline = None  # BatchedInferencePipeline over self._model (CUDA only)
 
-    def _resolve_device_and_compute_type(self, device_pref: str) -> Tuple[str, str]:
+    def _resolve_device_and_compute_type(self, device_pref: str, compute_type_pref: Optional[str] = None) -> Tuple[str, str]:
         # Prefer GPU if available and device_pref is auto or cuda
         device = device_pref
         
@@ -58,27 +219,54 @@ class WhisperASREngine:
                 print(f"Error checking CUDA availability: {e}")
                 device = "cpu"
                 
-        if device == "cuda":
-            compute_type = "float16"
-        else:
-            # CPU
-            compute_type = "int8"
+        compute_type = compute_type_pref or _pick_compute_type(device)
         return device, compute_type
 
     def _ensure_model(self, model_id: str, device: str, compute_type: str) -> None:
         key = (model_id, device, compute_type)
         if self._model is not None and self._cached_key == key:
             return
-        # Lazy import to avoid heavy module import during app startup
-        from faster_whisper import WhisperModel  # type: ignore
-        # Keep download_root consistent with model manager
-        download_root = str((self._settings.models_dir / "whisper" / "faster-whisper").resolve())
-        self._model = WhisperModel(
-            model_id,
-            device=device,
-            compute_type=compute_type,
-            download_root=download_root,
-        )
+        with _REGISTRY_LOCK:
+            model = _MODEL_REGISTRY.get(key)
+            if model is None:
+                load_kwargs: Dict[str, Any] = {}
+                if device == "cpu":
+                    threads = _cpu_threads()
+                    # Jobs decode mic and system concurrently: one worker per track, splitting
+                    # the intra-op threads between them so the total stays the same
+                    load_kwargs = {
+                        "cpu_threads": max(1, threads // _CPU_PARALLEL_FILES),
+                        "num_workers": _CPU_PARALLEL_FILES,
+                    }
+                # Lazy import to avoid heavy module import during app startup
+                from faster_whisper import WhisperModel  # type: ignore
+                # Drop the previous model before loading another so both never sit in (V)RAM together
+                while len(_MODEL_REGISTRY) >= _MAX_CACHED_MODELS:
+                    _MODEL_REGISTRY.popitem(last=False)
+                    self._model = None
+                    gc.collect()
+                # Keep download_root consistent with model manager
+                download_root = str((self._settings.models_dir / "whisper" / "faster-whisper").resolve())
+                model = WhisperModel(
+                    model_id,
+                    device=device,
+                    compute_type=compute_type,
+                    download_root=download_root,
+                    **load_kwargs,
+                )
+                _MODEL_REGISTRY[key] = model
+            else:
+                _MODEL_REGISTRY.move_to_end(key)
+        self._model = model
+        self._pipeline = None
+        if device == "cuda":
+            try:
+                from faster_whisper import BatchedInferencePipeline  # type: ignore
+
+                self._pipeline = BatchedInferencePipeline(model=model)
+            except Exception:
+                # faster-whisper < 1.1 has no batched pipeline
+                self._pipeline = None
         self._cached_key = key
 
     def transcribe_file(
@@ -93,87 +281,157 @@ class WhisperASREngine:
           {"t_start_ms", "t_end_ms", "text", "confidence"}
         and info is the faster-whisper info dict-like object.
         """
-        device, compute_type = self._resolve_device_and_compute_type(cfg.device)
+        return self.transcribe_batch([audio_path], cfg, progress_cb=progress_cb)[0]
+
+    def transcribe_batch(
+        self,
+        audio_paths: List[Path],
+        cfg: ASRConfig,
+        progress_cb: Optional[Callable[[float, str], None]] = None,
+    ) -> List[Tuple[List[dict], dict]]:
+        """Transcribe several audio files, returning one (segments, info) per path in order.
+
+        On CUDA with VAD enabled the speech chunks of all files share the batched
+        pipeline's forward passes, so short tracks fill batches together. Language
+        detection then runs once over the combined audio. Elsewhere (or if the
+        batched path fails) the files are transcribed one after another.
+        """
+        device, compute_type = self._resolve_device_and_compute_type(cfg.device, cfg.compute_type)
         self._ensure_model(cfg.model_id, device, compute_type)
+        if cfg.vad:
+            _accelerate_vad(device)
 
-        # Prepare decode params by mode
-        if cfg.mode == "accurate":
-            decode_params = dict(
-                beam_size=5,
-                best_of=5,
-                temperature=0.0,
-                condition_on_previous_text=False,
-                compression_ratio_threshold=2.4,
-                log_prob_threshold=-1.0,
-                no_speech_threshold=0.6,
-            )
-        else:
-            decode_params = dict(
-                beam_size=1,
-                best_of=1,
-                temperature=0.0,
-                condition_on_previous_text=False,
-                compression_ratio_threshold=2.4,
-                log_prob_threshold=-1.0,
-                no_speech_threshold=0.6,
-            )
+        n = len(audio_paths)
+        # Decoded samples, kept for the per-file path if the batched one bails out
+        audios: List[Optional[np.ndarray]] = [None] * n
+        if n > 1 and self._pipeline is not None and cfg.vad:
+            audios = [_load_pcm16k(p) for p in audio_paths]
+            if all(a is not None for a in audios):
+                try:
+                    return self._transcribe_batched_chunks(audios, cfg, progress_cb)  # type: ignore[arg-type]
+                except Exception:
+                    # Internal VAD helpers differ across faster-whisper versions; decode per file
+                    pass
+
+        file_cbs: List[Optional[Callable[[float, str], None]]] = [None] * n
+        if progress_cb is not None:
+            file_cbs = list(_combined_progress(progress_cb, n))
+        if n == 1:
+            return [self._transcribe_one(audio_paths[0], cfg, file_cbs[0], audios[0])]
+        # Independent files decode concurrently: CTranslate2 runs each on its own worker
+        # (or queues them on CUDA) while feature extraction and VAD of the other overlap
+        with ThreadPoolExecutor(max_workers=min(n, _CPU_PARALLEL_FILES), thread_name_prefix="asr-file") as pool:
+            return list(pool.map(self._transcribe_one, audio_paths, [cfg] * n, file_cbs, audios))
+
+    def _transcribe_batched_chunks(
+        self,
+        audios: List[np.ndarray],
+        cfg: ASRConfig,
+        progress_cb: Optional[Callable[[float, str], None]],
+    ) -> List[Tuple[List[dict], dict]]:
+        """Run the VAD chunks of all files through one BatchedInferencePipeline call.
+
+        Chunks are computed per file (so none spans two files), shifted to the file's
+        offset in the concatenated audio and passed as clip_timestamps; segments are
+        mapped back to their file by sample offset.
+        """
+        from faster_whisper.vad import VadOptions, get_speech_timestamps, merge_segments  # type: ignore
+
+        assert self._pipeline is not None
+        # Same VAD settings the batched pipeline uses for a single file
+        vad_options = VadOptions(max_speech_duration_s=30, min_silence_duration_ms=160)
+        clips: List[dict] = []
+        offsets: List[int] = []
+        offset = 0
+        for audio in audios:
+            offsets.append(offset)
+            # A track of digital silence (nothing played on the system side) has no speech
+            if audio.any():
+                for chunk in merge_segments(get_speech_timestamps(audio, vad_options), vad_options):
+                    clips.append({"start": chunk["start"] + offset, "end": chunk["end"] + offset})
+            offset += audio.shape[0]
+        durations = [a.shape[0] / _WHISPER_SAMPLE_RATE for a in audios]
+        if not clips:
+            info_out = {"language": cfg.language, "duration": 0.0}
+            if progress_cb is not None:
+                _safe_progress(progress_cb, 1.0, "completed")
+            return [([], dict(info_out, duration=d)) for d in durations]
+
+        seg_iter, info = self._pipeline.transcribe(
+            np.concatenate(audios),
+            vad_filter=False,
+            clip_timestamps=clips,
+            language=cfg.language,
+            task="transcribe",
+            batch_size=max(1, int(cfg.batch_size)),
+            **_decode_params(cfg),
+        )
+        segments = self._collect_segments(seg_iter, info, progress_cb)
+
+        per_file: List[List[dict]] = [[] for _ in audios]
+        file_starts_ms = np.asarray(offsets, dtype=np.int64) * 1000 // _WHISPER_SAMPLE_RATE
+        for seg in segments:
+            # A chunk never crosses files, so its midpoint identifies the file
+            mid = (seg["t_start_ms"] + seg["t_end_ms"]) // 2
+            idx = int(np.searchsorted(file_starts_ms, mid, side="right")) - 1
+            idx = max(0, idx)
+            base = int(file_starts_ms[idx])
+            seg["t_start_ms"] = max(0, seg["t_start_ms"] - base)
+            seg["t_end_ms"] = max(0, seg["t_end_ms"] - base)
+            per_file[idx].append(seg)
+
+        language = getattr(info, "language", None)
+        if progress_cb is not None:
+            _safe_progress(progress_cb, 1.0, "completed")
+        return [(segs, {"language": language, "duration": dur}) for segs, dur in zip(per_file, durations)]
+
+    def _transcribe_one(
+        self,
+        audio_path: Path,
+        cfg: ASRConfig,
+        progress_cb: Optional[Callable[[float, str], None]] = None,
+        audio: Optional[np.ndarray] = None,
+    ) -> Tuple[List[dict], dict]:
+        decode_params = _decode_params(cfg)
 
         vad_filter = bool(cfg.vad)
         language = cfg.language
 
-        segments_out: List[dict] = []
         # Call faster-whisper
         assert self._model is not None
         # Use faster-whisper's default VAD parameters for stability
         vad_kwargs = {}
 
-        seg_iter, info = self._model.transcribe(
-            str(audio_path),
-            vad_filter=vad_filter,
-            language=language,
-            task="transcribe",
-            **decode_params,
-            **vad_kwargs,
-        )
-        # Initial decode phase
-        if progress_cb is not None:
-            try:
-                progress_cb(0.05, "decoding")
-            except Exception:
-                pass
-        # Iterate and convert
-        for seg in seg_iter:
-            start_ms = int(seg.start * 1000.0) if seg.start is not None else 0
-            end_ms = int(seg.end * 1000.0) if seg.end is not None else start_ms
-            text = seg.text or ""
-            # Convert avg_logprob (typically ~[-1.0, 0.0]) to [0,1] and penalize no_speech_prob
-            conf = None
-            try:
-                avg_lp = float(getattr(seg, "avg_logprob", None)) if getattr(seg, "avg_logprob", None) is not None else None
-                no_sp = float(getattr(seg, "no_speech_prob", 0.0) or 0.0)
-                if avg_lp is not None:
-                    base = math.exp(avg_lp)  # [-1..0] → [~0.37..1.0]
-                    conf = max(0.0, min(1.0, base * (1.0 - max(0.0, min(1.0, no_sp)))))
-            except Exception:
-                conf = None
-            segments_out.append(
-                {
-                    "t_start_ms": start_ms,
-                    "t_end_ms": end_ms,
-                    "text": text,
-                    "confidence": conf,
-                }
-            )
-            # Progress update best-effort using known duration
+        # Decode our own WAVs in-process instead of through faster-whisper's generic decoder
+        if audio is None:
+            audio = _load_pcm16k(audio_path)
+        if audio is not None and not audio.any():
+            # All-zero samples: nothing for VAD to find, and without VAD Whisper would
+            # only hallucinate filler text over the silence
             if progress_cb is not None:
-                try:
-                    total = float(getattr(info, "duration", 0.0) or 0.0)
-                    frac = 0.05
-                    if total > 0:
-                        frac = min(0.98, max(0.05, float(end_ms) / 1000.0 / total))
-                    progress_cb(frac, "decoding")
-                except Exception:
-                    pass
+                _safe_progress(progress_cb, 1.0, "completed")
+            return [], {"language": language, "duration": audio.shape[0] / _WHISPER_SAMPLE_RATE}
+        # Batched decoding splits on VAD chunks, so it only applies with VAD enabled
+        if self._pipeline is not None and vad_filter:
+            seg_iter, info = self._pipeline.transcribe(
+                audio if audio is not None else str(audio_path),
+                vad_filter=True,
+                language=language,
+                task="transcribe",
+                batch_size=max(1, int(cfg.batch_size)),
+                **decode_params,
+                **vad_kwargs,
+            )
+        else:
+            seg_iter, info = self._model.transcribe(
+                audio if audio is not None else str(audio_path),
+                vad_filter=vad_filter,
+                language=language,
+                task="transcribe",
+                **decode_params,
+                **vad_kwargs,
+            )
+        segments_out = self._collect_segments(seg_iter, info, progress_cb)
 
         # info exposes language and duration
         info_out = {
@@ -181,10 +439,114 @@ class WhisperASREngine:
             "duration": float(getattr(info, "duration", 0.0) or 0.0),
         }
         if progress_cb is not None:
-            try:
-                progress_cb(1.0, "completed")
-            except Exception:
-                pass
+            _safe_progress(progress_cb, 1.0, "completed")
         return segments_out, info_out
 
+    @staticmethod
+    def _collect_segments(
+        seg_iter: Iterable[Any],
+        info: Any,
+        progress_cb: Optional[Callable[[float, str], None]],
+    ) -> List[dict]:
+        # Initial decode phase
+        if progress_cb is not None:
+            _safe_progress(progress_cb, 0.05, "decoding")
+        # Iterate once capturing raw fields; conversions are vectorized below
+        starts: List[float] = []
+        ends: List[float] = []
+        texts: List[str] = []
+        avg_lps: List[float] = []
+        no_sps: List[float] = []
+        total = float(getattr(info, "duration", 0.0) or 0.0)
+        last_cb = 0.0
+        for seg in seg_iter:
+            start_s = seg.start if seg.start is not None else 0.0
+            end_s = seg.end if seg.end is not None else start_s
+            starts.append(start_s)
+            ends.append(end_s)
+            texts.append(seg.text or "")
+            avg_lp = getattr(seg, "avg_logprob", None)
+            avg_lps.append(float(avg_lp) if avg_lp is not None else math.nan)
+            no_sps.append(float(getattr(seg, "no_speech_prob", 0.0) or 0.0))
+            # Progress update best-effort using known duration, at most every _PROGRESS_INTERVAL_S
+            if progress_cb is not None:
+                now = time.monotonic()
+                if now - last_cb >= _PROGRESS_INTERVAL_S:
+                    last_cb = now
+                    frac = 0.05
+                    if total > 0:
+                        frac = min(0.98, max(0.05, float(end_s) / total))
+                    _safe_progress(progress_cb, frac, "decoding")
+
+        if not texts:
+            return []
+        start_ms = (np.asarray(starts, dtype=np.float64) * 1000.0).astype(np.int64).tolist()
+        end_ms = (np.asarray(ends, dtype=np.float64) * 1000.0).astype(np.int64).tolist()
+        # Convert avg_logprob (typically ~[-1.0, 0.0]) to [0,1] and penalize no_speech_prob
+        lp = np.asarray(avg_lps, dtype=np.float64)
+        no_sp = np.clip(np.asarray(no_sps, dtype=np.float64), 0.0, 1.0)
+        conf_arr = np.clip(np.exp(lp) * (1.0 - no_sp), 0.0, 1.0)
+        confs = [None if math.isnan(c) else c for c in conf_arr.tolist()]
+        return [
+            {"t_start_ms": s_ms, "t_end_ms": e_ms, "text": text, "confidence": conf}
+            for s_ms, e_ms, text, conf in zip(start_ms, end_ms, texts, confs)
+        ]
+
+
+def _decode_params(cfg: ASRConfig) -> Dict[str, Any]:
+    # Prepare decode params by mode
+    if cfg.mode == "accurate":
+        return dict(
+            beam_size=5,
+            best_of=5,
+            temperature=0.0,
+            condition_on_previous_text=False,
+            compression_ratio_threshold=2.4,
+            log_prob_threshold=-1.0,
+            no_speech_threshold=0.6,
+        )
+    return dict(
+        beam_size=1,
+        best_of=1,
+        temperature=0.0,
+        condition_on_previous_text=False,
+        compression_ratio_threshold=2.4,
+        log_prob_threshold=-1.0,
+        no_speech_threshold=0.6,
+    )
+
+
+def _safe_progress(progress_cb: Callable[[float, str], None], frac: float, phase: str) -> None:
+    try:
+        progress_cb(frac, phase)
+    except Exception:
+        pass
+
+
+def _combined_progress(
+    progress_cb: Callable[[float, str], None], n: int
+) -> List[Callable[[float, str], None]]:
+    """One callback per file of a multi-file run; reports the mean of their progress.
+
+    Files may run concurrently, so updates are serialized and "completed" is only
+    passed on once every file has completed.
+    """
+    fracs = [0.0] * n
+    completed = [False] * n
+    lock = threading.Lock()
+
+    def make(idx: int) -> Callable[[float, str], None]:
+        def inner(frac: float, phase: str) -> None:
+            with lock:
+                fracs[idx] = frac
+                if phase == "completed":
+                    completed[idx] = True
+                    if not all(completed):
+                        phase = "decoding"
+                progress_cb(sum(fracs) / n, phase)
+
+        return inner
+
+    return [make(i) for i in range(n)]
+
 
@@ -1,9 +1,13 @@
 from __future__ import annotations
 
+from contextlib import contextmanager
 from dataclasses import dataclass
+from fnmatch import fnmatch
 from pathlib import Path
-from threading import Lock, Thread
-from typing import Dict, List, Optional
+from threading import Lock
+import importlib
+import os
+from typing import Callable, Dict, Iterator, List, Optional
 
 from app.config import Settings
 
@@ -14,6 +18,12 @@ class ASRPreset:
     label: str
     model_id: str  # faster-whisper model id for WhisperModel(...)
     size_bytes: Optional[int] = None  # indicative only
+    hf_repo: Optional[str] = None  # Hugging Face repo faster-whisper downloads this model from
+
+
+def _hf_cache_dir(root: Path, hf_repo: str) -> Path:
+    """Hugging Face cache folder for a repo under root (models--<org>--<name>)."""
+    return root / ("models--" + hf_repo.replace("/", "--"))
 
 
 def get_asr_models_dir(settings: Optional[Settings] = None) -> Path:
@@ -31,12 +41,14 @@ def get_asr_presets() -> List[ASRPreset]:
             label="Whisper Large v3 (CT2) (~3-4 GB, high accuracy)",
             model_id="large-v3",
             size_bytes=3_500_000_000,
+            hf_repo="Systran/faster-whisper-large-v3",
         ),
         ASRPreset(
             id="distil-large-v3",
-            label="Distil Whisper Large v3 (CT2) (~1.3-2 GB, faster)",
+            label="Distil Whisper Large v3 (CT2) (~1.3-2 GB, faster, English only)",
             model_id="distil-large-v3",
             size_bytes=1_800_000_000,
+            hf_repo="Systran/faster-distil-whisper-large-v3",
         ),
     ]
 
@@ -47,37 +59,60 @@ def resolve_asr_model_path_from_id(preset_id: str, settings: Optional[Settings]
     return models_dir / preset_id
 
 
+# Typical ctranslate2 whisper model files
+_CT2_REQUIRED_FILES = frozenset({"tokenizer.json", "config.json"})
+_CT2_MODEL_FILES = frozenset({"model.bin", "model.bin.0", "ggml-model.bin"})
+
+
 def _dir_contains_ct2_model(path: Path) -> bool:
+    # One directory listing instead of a stat per expected file
     try:
-        if not path.exists() or not path.is_dir():
-            return False
-        # Typical ctranslate2 whisper model files
-        required = ["tokenizer.json", "config.json"]
-        has_required = all((path / f).exists() for f in required)
-        has_model_bin = any((path / n).exists() for n in ["model.bin", "model.bin.0", "ggml-model.bin"])
-        return bool(has_required and has_model_bin)
-    except Exception:
+        with os.scandir(path) as it:
+            # is_file() follows symlinks: Hugging Face snapshots link files to blobs/
+            names = {e.name for e in it if e.is_file()}
+    except OSError:
         return False
+    return _CT2_REQUIRED_FILES.issubset(names) and not _CT2_MODEL_FILES.isdisjoint(names)
+
+
+# (models root, preset id) → resolved model dir; reset when a preset is downloaded
+_discovered_dirs: Dict[tuple[str, str], Path] = {}
+
+
+def _candidate_model_dirs(root: Path, preset_id: str) -> List[Path]:
+    """Directories where faster-whisper may have stored a preset, most likely first."""
+    candidates = [root / preset_id]
+    preset = next((p for p in get_asr_presets() if p.id == preset_id), None)
+    if preset is not None and preset.hf_repo:
+        candidates.extend(sorted((_hf_cache_dir(root, preset.hf_repo) / "snapshots").glob("*")))
+    candidates.extend(sorted(root.glob(f"models--*{preset_id}*/snapshots/*")))
+    return candidates
 
 
 def discover_asr_model_dir(preset_id: str, settings: Optional[Settings] = None) -> Path | None:
     """Locate an existing CT2 model directory for the given preset under our models root.
 
     Some faster-whisper versions may store models under repo-like names instead of the
-    plain preset id. We scan recursively for a directory that looks like a CT2 model.
+    plain preset id. Known layouts are probed first; a recursive scan is the fallback.
     """
     root = get_asr_models_dir(settings)
-    # 1) Expected location
-    candidate = root / preset_id
-    if _dir_contains_ct2_model(candidate):
-        return candidate
-    # 2) Scan one level deep
+    cache_key = (str(root), preset_id)
+    cached = _discovered_dirs.get(cache_key)
+    if cached is not None and cached.is_dir():
+        return cached
+    # 1) Known locations: <preset_id>/ and Hugging Face cache snapshots
+    for candidate in _candidate_model_dirs(root, preset_id):
+        if _dir_contains_ct2_model(candidate):
+            _discovered_dirs[cache_key] = candidate
+            return candidate
+    # 2) Fall back to a full scan
     try:
         for child in root.rglob("*"):
             try:
                 if child.is_dir() and _dir_contains_ct2_model(child):
                     # Prefer directories that include the preset id in their path
                     if preset_id in str(child).lower():
+                        _discovered_dirs[cache_key] = child
                         return child
             except Exception:
                 continue
@@ -86,11 +121,66 @@ def discover_asr_model_dir(preset_id: str, settings: Optional[Settings] = None)
     return None
 
 
+# Files faster-whisper fetches from a model repo (faster_whisper.utils.download_model)
+_FW_ALLOW_PATTERNS = ["config.json", "preprocessor_config.json", "model.bin", "tokenizer.json", "vocabulary.*"]
+
+
+def _expected_download_bytes(hf_repo: str) -> Optional[int]:
+    """Exact byte size of the files faster-whisper will download, from the Hub's file metadata."""
+    try:
+        from huggingface_hub import HfApi  # type: ignore
+
+        info = HfApi().model_info(hf_repo, files_metadata=True)
+        total = sum(
+            int(f.size or 0)
+            for f in (info.siblings or [])
+            if any(fnmatch(f.rfilename, pat) for pat in _FW_ALLOW_PATTERNS)
+        )
+        return total or None
+    except Exception:
+        return None
+
+
+@contextmanager
+def _hf_byte_progress(on_bytes: Callable[[int], None]) -> Iterator[None]:
+    """Report bytes received by huggingface_hub downloads while the context is active.
+
+    huggingface_hub creates its per-file byte bars through the tqdm class of its
+    utils.tqdm module (for both HTTP and Xet transfers); a counting subclass is swapped
+    in there, so progress comes straight from the transfer instead of polling the disk.
+    """
+    try:
+        hf_tqdm_mod = importlib.import_module("huggingface_hub.utils.tqdm")
+        base = hf_tqdm_mod.tqdm
+    except Exception:
+        yield
+        return
+
+    class _CountingTqdm(base):  # type: ignore[misc, valid-type]
+        def __init__(self, *args, **kwargs) -> None:
+            super().__init__(*args, **kwargs)
+            self._count_bytes = kwargs.get("unit") == "B"
+            # Resumed downloads start from the bytes already on disk
+            if self._count_bytes and kwargs.get("initial"):
+                on_bytes(int(kwargs["initial"]))
+
+        def update(self, n=1):  # noqa: ANN001 - tqdm signature
+            if getattr(self, "_count_bytes", False) and n:
+                on_bytes(int(n))
+            return super().update(n)
+
+    hf_tqdm_mod.tqdm = _CountingTqdm
+    try:
+        yield
+    finally:
+        hf_tqdm_mod.tqdm = base
+
+
 _dl_lock = Lock()
 _dl_state: Dict[str, object] = {
     "status": "idle",  # idle|running|done|error
     "preset_id": None,
-    "progress": 0.0,  # best-effort; faster-whisper download API has no direct progress hooks
+    "progress": 0.0,  # bytes received / expected bytes, from huggingface_hub's transfer callbacks
     "message": None,
     "path": None,
 }
@@ -106,8 +196,27 @@ def _set_state(**kwargs: object) -> None:
         _dl_state.update(kwargs)
 
 
+def begin_asr_download(preset_id: str) -> bool:
+    """Mark a download of preset_id as running; False if one is already running.
+
+    Lets the caller report "running" before the download thread has started.
+    """
+    with _dl_lock:
+        if _dl_state["status"] == "running":
+            return False
+        _dl_state.update(status="running", preset_id=preset_id, progress=0.0, message="downloading", path=None)
+        return True
+
+
+def fail_asr_download(message: str) -> None:
+    """Mark the download claimed by begin_asr_download as failed (it never started)."""
+    _set_state(status="error", message=message)
+
+
 def _perform_fw_download(preset_id: str, settings: Optional[Settings] = None) -> Path:
     """Use faster-whisper's own downloader by instantiating WhisperModel once."""
+    # Our byte counter replaces huggingface_hub's console bars (read when it is first imported)
+    os.environ.setdefault("HF_HUB_DISABLE_PROGRESS_BARS", "1")
     # Import here to avoid heavy import at module load
     from faster_whisper import WhisperModel  # type: ignore
 
@@ -118,57 +227,41 @@ def _perform_fw_download(preset_id: str, settings: Optional[Settings] = None) ->
     # faster-whisper downloads into download_root/<model_id>
     _set_state(status="running", preset_id=preset_id, progress=0.01, message="starting", path=None)
 
-    # Best-effort progress monitor by directory size
     expected_bytes = None
+    hf_repo = None
     try:
         for p in get_asr_presets():
             if p.id == preset_id:
                 expected_bytes = p.size_bytes
+                hf_repo = p.hf_repo
                 break
     except Exception:
         expected_bytes = None
+    if hf_repo:
+        # Exact total from the Hub; the preset size stays as fallback when offline
+        expected_bytes = _expected_download_bytes(hf_repo) or expected_bytes
+
+    received = {"bytes": 0}
+    received_lock = Lock()
+
+    def _on_bytes(n: int) -> None:
+        with received_lock:
+            received["bytes"] += n
+            done = received["bytes"]
+        if expected_bytes and expected_bytes > 0:
+            frac = min(0.99, max(0.02, float(done) / float(expected_bytes)))
+            _set_state(progress=frac, message="downloading")
+        else:
+            _set_state(message="downloading")
 
-    def _calc_dir_size_bytes(p: Path) -> int:
-        total = 0
-        try:
-            if not p.exists():
-                return 0
-            for sub in p.rglob("*"):
-                try:
-                    if sub.is_file():
-                        total += sub.stat().st_size
-                except Exception:
-                    pass
-        except Exception:
-            return total
-        return total
-
-    _stop_flag = {"stop": False}
-
-    def _monitor() -> None:
-        import time
-        while not _stop_flag["stop"]:
-            try:
-                size = _calc_dir_size_bytes(target_dir)
-                if expected_bytes and expected_bytes > 0:
-                    frac = min(0.99, max(0.02, float(size) / float(expected_bytes)))
-                else:
-                    prev = float(get_asr_download_state().get("progress", 0.0) or 0.0)
-                    frac = min(0.8, prev + 0.02)
-                _set_state(progress=frac, message="downloading")
-            except Exception:
-                pass
-            time.sleep(1.0)
-
-    mon = Thread(target=_monitor, daemon=True)
-    mon.start()
     try:
-        model = WhisperModel(
-            preset_id,
-            device="cpu",
-            compute_type="int8",
-            download_root=str(get_asr_models_dir(s)),
-        )
+        with _hf_byte_progress(_on_bytes):
+            model = WhisperModel(
+                preset_id,
+                device="cpu",
+                compute_type="int8",
+                download_root=str(get_asr_models_dir(s)),
+            )
         # Force a tiny inference to ensure tokenizer and model are fully resolved on disk
         _set_state(progress=0.99, message="finalizing")
         try:
@@ -177,11 +270,9 @@ def _perform_fw_download(preset_id: str, settings: Optional[Settings] = None) ->
         except Exception:
             pass
     except Exception as e:
-        _stop_flag["stop"] = True
         _set_state(status="error", message=str(e))
         raise
     # At this point, files live under download_root/<preset_id>
-    _stop_flag["stop"] = True
     _set_state(status="done", progress=1.0, message="downloaded", path=str(target_dir))
     return target_dir
 
@@ -189,9 +280,11 @@ def _perform_fw_download(preset_id: str, settings: Optional[Settings] = None) ->
 def download_asr_preset(preset_id: str, settings: Optional[Settings] = None) -> Path:
     presets = {p.id: p for p in get_asr_presets()}
     if preset_id not in presets:
+        _set_state(status="error", message=f"Unknown ASR preset id: {preset_id}")
         raise ValueError(f"Unknown ASR preset id: {preset_id}")
 
     s = settings or Settings()
+    _discovered_dirs.clear()
     dst_dir = resolve_asr_model_path_from_id(preset_id, s)
     if dst_dir.exists() and any(dst_dir.iterdir()):
         # Already present
@@ -1,10 +1,11 @@
 from __future__ import annotations
 
+import queue
 import threading
 import wave
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional, Dict
+from typing import BinaryIO, Optional, Dict
 
 import numpy as np
 import logging
@@ -38,12 +39,160 @@ if sc is not None:
         pass
 
 
+# Userspace write buffer for WAV tracks (~16 s of 16 kHz mono int16 per flush)
+_WAV_BUFFER_BYTES = 512 * 1024
+
+# Queued blocks (~2 s from a 48 kHz device) after which a track writer is reported as lagging
+_WRITER_LAG_WARN_BLOCKS = 24
+
+# float [-1,1] → int16 full scale
+_PCM16_GAIN = 32767.0
+
+
+class _BlockScratch:
+    """Reusable per-stream buffers so the capture path does not allocate per block."""
+
+    def __init__(self, size: int = DEFAULT_BLOCKSIZE * 2) -> None:
+        self._alloc(size)
+        self._weights: Dict[int, np.ndarray] = {}
+
+    def _alloc(self, size: int) -> None:
+        self.mono = np.empty(size, dtype=np.float32)
+        self.i16 = np.empty(size, dtype=np.int16)
+        self.acc = np.empty(size, dtype=np.int32)
+
+    def ensure(self, n: int) -> None:
+        if n > self.mono.shape[0]:
+            self._alloc(n)
+
+    def weights(self, channels: int) -> np.ndarray:
+        """Per-channel downmix weights with the int16 gain folded in."""
+        w = self._weights.get(channels)
+        if w is None:
+            w = np.full(channels, _PCM16_GAIN / channels, dtype=np.float32)
+            self._weights[channels] = w
+        return w
+
+
+class _WavWriter:
+    """Converts and writes one capture track to a WAV file from a dedicated thread.
+
+    Capture callbacks only copy the raw block into a queue, so downmixing,
+    resampling and disk writes never run on the PortAudio thread; blocks that
+    queue up meanwhile are written in one call. Each track has its own writer, so
+    mic and system DSP run in parallel (soxr and NumPy release the GIL).
+
+    ``sample_dtype`` is the dtype the capture backend delivers: int16 blocks stay
+    integer end to end, float32 blocks (soundcard) are scaled once and cast at the end.
+    """
+
+    def __init__(
+        self,
+        wf: wave.Wave_write,
+        src_rate: Optional[int],
+        dst_rate: int,
+        name: str = "track",
+        sample_dtype: str = "int16",
+        fh: Optional[BinaryIO] = None,
+    ) -> None:
+        self._wf = wf
+        self._fh = fh  # file object under wf; wave does not close files it did not open
+        self._name = name
+        self._lag_warned = False
+        self._write_failed = False
+        self._int_path = sample_dtype == "int16"
+        # Persistent resampler: filter taps are built once and its state carries across
+        # block boundaries (no per-block setup, no edge clicks)
+        self._resampler = (
+            soxr.ResampleStream(src_rate, dst_rate, 1, dtype=sample_dtype, quality="HQ")
+            if src_rate and src_rate != dst_rate
+            else None
+        )
+        self._scratch = _BlockScratch()
+        self.frames = 0  # frames written at dst_rate
+        self._q: "queue.SimpleQueue[Optional[np.ndarray]]" = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name=f"audio-writer-{name}", daemon=True)
+        self._thread.start()
+
+    def push(self, block: np.ndarray) -> None:
+        # The capture backend reuses its buffer after the callback returns
+        self._q.put(block.copy())
+        # Backpressure is only reported, never resolved by dropping audio
+        if not self._lag_warned and self._q.qsize() > _WRITER_LAG_WARN_BLOCKS:
+            self._lag_warned = True
+            logger.warning("Audio writer falling behind", extra={"track": self._name, "queued_blocks": self._q.qsize()})
+
+    def _run(self) -> None:
+        done = False
+        while not done:
+            blocks = [self._q.get()]
+            while True:
+                try:
+                    blocks.append(self._q.get_nowait())
+                except queue.Empty:
+                    break
+            out = []
+            frames = 0
+            for raw in blocks:
+                if raw is None:
+                    done = True
+                    continue
+                try:
+                    if self._int_path:
+                        pcm = _convert_block_int16(raw, self._resampler, self._scratch)
+                    else:
+                        pcm = _convert_block(raw, self._resampler, self._scratch)
+                except Exception:
+                    # Lose this block, not the writer: push() would keep queueing forever
+                    logger.exception("Audio block conversion failed", extra={"track": self._name})
+                    continue
+                out.append(pcm.tobytes())
+                frames += pcm.shape[0]
+            if done and self._resampler is not None:
+                try:
+                    # Flush the samples still held in the filter delay line
+                    empty = np.empty((0,), dtype=np.int16 if self._int_path else np.float32)
+                    tail = self._resampler.resample_chunk(empty, last=True)
+                    if tail.shape[0]:
+                        pcm = tail if self._int_path else _scaled_to_int16(tail, self._scratch)
+                        out.append(pcm.tobytes())
+                        frames += pcm.shape[0]
+                except Exception:
+                    logger.exception("Audio resampler flush failed", extra={"track": self._name})
+            if out:
+                try:
+                    # writeframes() would seek back and rewrite the RIFF header on every
+                    # call; the raw variant only appends and close() patches the header once
+                    self._wf.writeframesraw(b"".join(out))
+                except Exception:
+                    # e.g. disk full; frames only counts audio that reached the file
+                    if not self._write_failed:
+                        self._write_failed = True
+                        logger.exception("Audio write failed, dropping audio", extra={"track": self._name})
+                    continue
+                self.frames += frames
+
+    def close(self) -> None:
+        # Drain everything queued so far, then finalize the header
+        self._q.put(None)
+        self._thread.join(timeout=5.0)
+        if self._thread.is_alive():
+            # The queue is finite, so the writer finishes; closing under it would corrupt the file
+            logger.warning("Audio writer still draining, waiting", extra={"track": self._name, "queued_blocks": self._q.qsize()})
+            self._thread.join()
+        try:
+            self._wf.close()
+        finally:
+            if self._fh is not None:
+                self._fh.close()
+
+
 @dataclass
 class _StreamBundle:
     mic_stream: Optional[sd.InputStream]
     sys_stream: Optional[sd.InputStream]
-    mic_wav: Optional[wave.Wave_write]  # Separate mic track
-    sys_wav: Optional[wave.Wave_write]  # Separate system track
+    mic_wav: Optional[_WavWriter]  # Separate mic track
+    sys_wav: Optional[_WavWriter]  # Separate system track
     mic_frames: int = 0
     sys_frames: int = 0
     sys_thread: Optional[threading.Thread] = None
@@ -54,27 +203,98 @@ class _StreamBundle:
     sys_rate: Optional[int] = None
     sys_channels: Optional[int] = None
     sys_backend: Optional[str] = None  # "sounddevice" | "soundcard"
-    target_rate: int = 48000
+    # Tracks are only used for ASR, so they are stored at Whisper's 16 kHz input rate
+    target_rate: int = 16000
 
 
 _recordings: Dict[str, _StreamBundle] = {}
 
 
-def _open_wav(path: Path, channels: int, samplerate: int) -> wave.Wave_write:
+def _open_wav(
+    path: Path,
+    channels: int,
+    samplerate: int,
+    src_rate: Optional[int] = None,
+    sample_dtype: str = "int16",
+) -> _WavWriter:
     path.parent.mkdir(parents=True, exist_ok=True)
-    wf = wave.open(str(path), "wb")
+    fh = open(path, "wb", buffering=_WAV_BUFFER_BYTES)
+    wf = wave.open(fh, "wb")
     wf.setnchannels(channels)
     wf.setsampwidth(2)  # int16
     wf.setframerate(samplerate)
-    return wf
+    return _WavWriter(wf, src_rate, samplerate, name=path.stem, sample_dtype=sample_dtype, fh=fh)
+
+
+def _downmix_int16(data: np.ndarray, scratch: _BlockScratch) -> np.ndarray:
+    """Average int16 channels to mono int16 without leaving the integer domain.
+
+    Mono input is returned as a view. The mean of int16 samples always fits in
+    int16, so no clipping is needed.
+    """
+    if data.ndim == 1:
+        return data
+    n, channels = data.shape
+    if channels == 1:
+        return data.reshape(-1)
+    scratch.ensure(n)
+    acc = scratch.acc[:n]
+    np.sum(data, axis=1, dtype=np.int32, out=acc)
+    if channels == 2:
+        np.right_shift(acc, 1, out=acc)
+    else:
+        np.floor_divide(acc, channels, out=acc)
+    out = scratch.i16[:n]
+    np.copyto(out, acc, casting="unsafe")
+    return out
+
 
+def _convert_block_int16(data: np.ndarray, resampler: Optional["soxr.ResampleStream"], scratch: _BlockScratch) -> np.ndarray:
+    """int16 capture block → mono int16 at the track rate; soxr resamples int16 natively."""
+    mono = _downmix_int16(data, scratch)
+    if resampler is not None:
+        mono = resampler.resample_chunk(mono)
+    return mono
 
-def _to_mono_int16(data: np.ndarray) -> np.ndarray:
-    """Convert float32/other shaped buffers to mono int16 for WAV writing."""
+
+def _downmix_scaled(data: np.ndarray, scratch: _BlockScratch) -> np.ndarray:
+    """Downmix a capture block to mono float32 already scaled to the int16 range.
+
+    A single matrix-vector product (or one multiply for mono input) averages the
+    channels and applies the gain in one pass over the block, into scratch storage.
+    Resampling is linear, so scaling before it is equivalent to scaling after.
+    """
     data_f32 = data.astype(np.float32, copy=False)
-    if data_f32.ndim == 2 and data_f32.shape[1] > 1:
-        data_f32 = data_f32.mean(axis=1)
-    return np.clip(data_f32 * 32767.0, -32768, 32767).astype(np.int16)
+    if data_f32.ndim == 1:
+        data_f32 = data_f32[:, None]
+    n, channels = data_f32.shape
+    scratch.ensure(n)
+    mono = scratch.mono[:n]
+    if channels == 1:
+        np.multiply(data_f32[:, 0], _PCM16_GAIN, out=mono)
+    else:
+        np.dot(data_f32, scratch.weights(channels), out=mono)
+    return mono
+
+
+def _scaled_to_int16(f32: np.ndarray, scratch: _BlockScratch) -> np.ndarray:
+    """Clip int16-range float32 samples in place and cast them into the int16 scratch buffer."""
+    n = f32.shape[0]
+    scratch.ensure(n)
+    # In-place max/min instead of np.clip: no temporaries, and hot mic spikes still saturate
+    np.maximum(f32, -32768.0, out=f32)
+    np.minimum(f32, 32767.0, out=f32)
+    out = scratch.i16[:n]
+    np.copyto(out, f32, casting="unsafe")
+    return out
+
+
+def _convert_block(data: np.ndarray, resampler: Optional["soxr.ResampleStream"], scratch: _BlockScratch) -> np.ndarray:
+    """Capture block → mono int16 at the track rate, staying in float32 until the final cast."""
+    f32 = _downmix_scaled(data, scratch)
+    if resampler is not None:
+        f32 = resampler.resample_chunk(f32)
+    return _scaled_to_int16(f32, scratch)
 
 
 def _queue_put_safe(q: asyncio.Queue, data: np.ndarray) -> None:
@@ -123,19 +343,10 @@ def start_recording(meeting_id: str, mic_device_id: Optional[str], output_device
         def _mic_cb(indata, frames, time, status):  # noqa: ANN001 - external callback signature
             if status:  # pragma: no cover
                 pass
-            # Convert to float32 mono [-1,1] and resample to target
-            f32 = _to_mono_int16(indata).astype(np.float32) / 32768.0
-            if bundle.mic_rate and bundle.mic_rate != bundle.target_rate:
-                try:
-                    f32 = soxr.resample(f32, bundle.mic_rate, bundle.target_rate)
-                except Exception:
-                    pass
-            
-            # Write to separate mic track
+            # Hand the raw block to the mic track writer; conversion happens on its thread
             if bundle.mic_wav is not None:
                 try:
-                    bundle.mic_wav.writeframes(np.clip(f32 * 32767.0, -32768, 32767).astype(np.int16).tobytes())
-                    bundle.mic_frames += f32.shape[0]
+                    bundle.mic_wav.push(indata)
                 except Exception:
                     pass
             
@@ -144,7 +355,7 @@ def start_recording(meeting_id: str, mic_device_id: Optional[str], output_device
         mic_stream = sd.InputStream(
             device=mic_dev,
             channels=mic_channels,
-            dtype="float32",
+            dtype="int16",
             samplerate=mic_rate,
             blocksize=DEFAULT_BLOCKSIZE,
             callback=_mic_cb,
@@ -154,7 +365,7 @@ def start_recording(meeting_id: str, mic_device_id: Optional[str], output_device
         bundle.mic_rate = mic_rate
         bundle.mic_channels = mic_channels
         # Open separate mic track
-        bundle.mic_wav = _open_wav(mic_path, channels=1, samplerate=bundle.target_rate)
+        bundle.mic_wav = _open_wav(mic_path, channels=1, samplerate=bundle.target_rate, src_rate=mic_rate)
         logger.info("Mic capture started", extra={"device": mic_info.get("name"), "rate": mic_rate, "channels": mic_channels})
 
     # SYSTEM LOOPBACK
@@ -184,18 +395,10 @@ def start_recording(meeting_id: str, mic_device_id: Optional[str], output_device
             def _sys_cb(indata, frames, time, status):  # noqa: ANN001 - external callback signature
                 if status:  # pragma: no cover
                     pass
-                f32 = _to_mono_int16(indata).astype(np.float32) / 32768.0
-                if bundle.sys_rate and bundle.sys_rate != bundle.target_rate:
-                    try:
-                        f32 = soxr.resample(f32, bundle.sys_rate, bundle.target_rate)
-                    except Exception:
-                        pass
-                
-                # Write to separate system track
+                # Hand the raw block to the system track writer
                 if bundle.sys_wav is not None:
                     try:
-                        bundle.sys_wav.writeframes(np.clip(f32 * 32767.0, -32768, 32767).astype(np.int16).tobytes())
-                        bundle.sys_frames += f32.shape[0]
+                        bundle.sys_wav.push(indata)
                     except Exception:
                         pass
                 
@@ -204,7 +407,7 @@ def start_recording(meeting_id: str, mic_device_id: Optional[str], output_device
             sys_stream = sd.InputStream(
                 device=out_dev,
                 channels=sys_channels,
-                dtype="float32",
+                dtype="int16",
                 samplerate=out_rate,
                 blocksize=DEFAULT_BLOCKSIZE,
                 callback=_sys_cb,
@@ -216,7 +419,7 @@ def start_recording(meeting_id: str, mic_device_id: Optional[str], output_device
             bundle.sys_rate = out_rate
             bundle.sys_channels = sys_channels
             # Open separate system track
-            bundle.sys_wav = _open_wav(sys_path, channels=1, samplerate=bundle.target_rate)
+            bundle.sys_wav = _open_wav(sys_path, channels=1, samplerate=bundle.target_rate, src_rate=out_rate)
             logger.info("System loopback (sounddevice) started", extra={"device": out_info.get("name"), "rate": out_rate, "channels": sys_channels})
         except Exception:
             # Fallback to soundcard loopback using loopback microphone API
@@ -244,18 +447,10 @@ def start_recording(meeting_id: str, mic_device_id: Optional[str], output_device
                 with mic.recorder(samplerate=out_rate, blocksize=DEFAULT_BLOCKSIZE) as rec:
                     while not stop_event.is_set():
                         data = rec.record(DEFAULT_BLOCKSIZE)
-                        f32 = _to_mono_int16(data).astype(np.float32) / 32768.0
-                        if bundle.sys_rate and bundle.sys_rate != bundle.target_rate:
-                            try:
-                                f32 = soxr.resample(f32, bundle.sys_rate, bundle.target_rate)
-                            except Exception:
-                                pass
-                        
-                        # Write to separate system track
+                        # Hand the raw block to the system track writer
                         if bundle.sys_wav is not None:
                             try:
-                                bundle.sys_wav.writeframes(np.clip(f32 * 32767.0, -32768, 32767).astype(np.int16).tobytes())
-                                bundle.sys_frames += f32.shape[0]
+                                bundle.sys_wav.push(data)
                             except Exception:
                                 pass
                         
@@ -268,8 +463,10 @@ def start_recording(meeting_id: str, mic_device_id: Optional[str], output_device
             bundle.sys_backend = "soundcard"
             bundle.sys_rate = out_rate
             bundle.sys_channels = sys_channels
-            # Open separate system track for soundcard backend
-            bundle.sys_wav = _open_wav(sys_path, channels=1, samplerate=bundle.target_rate)
+            # Open separate system track for soundcard backend (it only records float32)
+            bundle.sys_wav = _open_wav(
+                sys_path, channels=1, samplerate=bundle.target_rate, src_rate=out_rate, sample_dtype="float32"
+            )
             logger.info("System loopback (soundcard) started", extra={"rate": out_rate, "channels": sys_channels})
 
     # bundle already registered; fields were filled above
@@ -299,11 +496,13 @@ def stop_recording(meeting_id: str) -> Dict[str, str]:
                 bundle.mic_wav.close()
             except Exception:
                 pass
+            bundle.mic_frames = bundle.mic_wav.frames
         if bundle.sys_wav:
             try:
                 bundle.sys_wav.close()
             except Exception:
                 pass
+            bundle.sys_frames = bundle.sys_wav.frames
     meeting_dir = settings.audio_dir / meeting_id
     return {
         "mic_path": str(meeting_dir / "mic.wav") if bundle.mic_wav else None,
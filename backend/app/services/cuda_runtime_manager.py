@@ -5,15 +5,19 @@ This allows us to ship a smaller binary and download GPU support only when neede
 
 import os
 import sys
-import hashlib
 import shutil
+import struct
 import zipfile
+import zlib
 import tarfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Optional, Dict, List, Tuple
+from typing import Optional, Dict, List, Set, Tuple
 from dataclasses import dataclass
-import requests
+import urllib3
 from app.config import Settings
+from app.services.hashing import BackgroundHasher
 
 @dataclass
 class CUDALibrary:
@@ -24,6 +28,14 @@ class CUDALibrary:
     sha256: str
     required_for: List[str]  # e.g., ["whisper_gpu", "llama_gpu"]
 
+# Wheels downloaded at once; they all come from the same host
+MAX_PARALLEL_DOWNLOADS = 4
+# Bytes per copy step when downloading and extracting wheels
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+# DLLs below this size are decompressed into memory and written in one call; larger
+# ones (cuBLAS, cuDNN run to hundreds of MB) stream to disk so parallel installs stay small
+SMALL_DLL_BYTES = 4 * 1024 * 1024
+
 # CUDA 12.9 Runtime Libraries for Windows x64
 # These URLs point to the official NVIDIA PyPI wheels
 CUDA_LIBRARIES: Dict[str, CUDALibrary] = {
@@ -56,11 +68,152 @@ class CUDAState:
         self.available_libraries: Dict[str, bool] = {}
         self.download_progress: Dict[str, float] = {}
         self.is_downloading = False
-        self.current_download = None
+        self.current_download = None  # least advanced of active_downloads, shown by the UI
+        self.active_downloads: Set[str] = set()
         self.error_message: Optional[str] = None
+        # Guards the fields above while libraries download in parallel
+        self.lock = threading.Lock()
+
+    def set_active(self, lib_name: str, active: bool) -> None:
+        with self.lock:
+            if active:
+                self.active_downloads.add(lib_name)
+            else:
+                self.active_downloads.discard(lib_name)
+            self.current_download = min(
+                self.active_downloads,
+                key=lambda name: self.download_progress.get(name, 0.0),
+                default=None,
+            )
 
 cuda_state = CUDAState()
 
+class _HashingWriter:
+    """File wrapper for shutil.copyfileobj: hashes and reports progress for each write.
+
+    Hashing runs on a BackgroundHasher thread; call hexdigest() or close() when done.
+    """
+
+    def __init__(self, f, lib_name: str, total_size: int, progress_callback=None, initial: int = 0, hash_bytes: bool = True):
+        self._f = f
+        self._lib_name = lib_name
+        self._total_size = total_size
+        self._progress_callback = progress_callback
+        self._hasher = BackgroundHasher() if hash_bytes else None
+        self._last_percent = -1
+        self.downloaded = initial
+
+    def seed(self, path: Path) -> None:
+        """Hash bytes already on disk from an earlier, interrupted download."""
+        with open(path, "rb") as existing:
+            for chunk in iter(lambda: existing.read(DOWNLOAD_CHUNK_SIZE), b""):
+                self._hasher.update(chunk)
+
+    def write(self, chunk: bytes) -> int:
+        self._f.write(chunk)
+        if self._hasher is not None:
+            self._hasher.update(chunk)
+        self.downloaded += len(chunk)
+        self.report()
+        return len(chunk)
+
+    def report(self) -> None:
+        if self._total_size > 0:
+            progress = (self.downloaded / self._total_size) * 100
+            # Report once per whole percent rather than on every write
+            if int(progress) != self._last_percent:
+                self._last_percent = int(progress)
+                cuda_state.download_progress[self._lib_name] = progress
+                if self._progress_callback:
+                    self._progress_callback(self._lib_name, progress)
+
+    def hexdigest(self) -> str:
+        return self._hasher.hexdigest()
+
+    def close(self) -> None:
+        if self._hasher is not None:
+            self._hasher.close()
+
+
+# ZIP structures used to pull DLLs out of a remote wheel with Range requests
+_ZIP_EOCD = struct.Struct("<4s4H2LH")  # end of central directory record
+_ZIP_CDH = struct.Struct("<4s6H3L5H2L")  # central directory file header
+_ZIP_LFH = struct.Struct("<4s5H3L2H")  # local file header
+_ZIP_TAIL_BYTES = 64 * 1024  # EOCD (plus comment) always fits in the last 64 KiB
+
+
+@dataclass
+class _RemoteZipEntry:
+    filename: str
+    method: int
+    crc: int
+    compressed_size: int
+    header_offset: int
+
+
+def _range_get(pool: urllib3.PoolManager, url: str, byte_range: str) -> Optional[urllib3.BaseHTTPResponse]:
+    """GET a byte range; None if the server does not honour Range."""
+    response = pool.request(
+        "GET",
+        url,
+        headers={"Range": f"bytes={byte_range}"},
+        preload_content=False,
+        timeout=urllib3.Timeout(connect=30, read=30),
+    )
+    if response.status != 206:
+        response.release_conn()
+        return None
+    return response
+
+
+def _read_range(pool: urllib3.PoolManager, url: str, byte_range: str) -> Optional[Tuple[bytes, str]]:
+    response = _range_get(pool, url, byte_range)
+    if response is None:
+        return None
+    try:
+        return response.read(), response.headers.get("content-range", "")
+    finally:
+        response.release_conn()
+
+
+def _remote_zip_entries(pool: urllib3.PoolManager, url: str) -> Optional[List[_RemoteZipEntry]]:
+    """Parse a remote ZIP's central directory; None when Range or the layout is unsupported."""
+    tail = _read_range(pool, url, f"-{_ZIP_TAIL_BYTES}")
+    if tail is None:
+        return None
+    data, content_range = tail
+    try:
+        total = int(content_range.rsplit("/", 1)[1])
+    except (IndexError, ValueError):
+        return None
+    tail_start = total - len(data)
+    pos = data.rfind(b"PK\x05\x06")
+    if pos < 0 or pos + _ZIP_EOCD.size > len(data):
+        return None
+    _, _, _, _, n_entries, cd_size, cd_offset, _ = _ZIP_EOCD.unpack_from(data, pos)
+    if cd_offset == 0xFFFFFFFF or n_entries == 0xFFFF:
+        return None  # ZIP64; not needed for the wheels we fetch
+    if cd_offset >= tail_start:
+        cd = data[cd_offset - tail_start:cd_offset - tail_start + cd_size]
+    else:
+        fetched = _read_range(pool, url, f"{cd_offset}-{cd_offset + cd_size - 1}")
+        if fetched is None:
+            return None
+        cd = fetched[0]
+    entries: List[_RemoteZipEntry] = []
+    off = 0
+    for _ in range(n_entries):
+        fields = _ZIP_CDH.unpack_from(cd, off)
+        if fields[0] != b"PK\x01\x02":
+            return None
+        method, crc, comp_size = fields[4], fields[7], fields[8]
+        name_len, extra_len, comment_len, header_offset = fields[10], fields[11], fields[12], fields[16]
+        name = cd[off + _ZIP_CDH.size:off + _ZIP_CDH.size + name_len].decode("utf-8", "replace")
+        entries.append(_RemoteZipEntry(name, method, crc, comp_size, header_offset))
+        off += _ZIP_CDH.size + name_len + extra_len + comment_len
+    return entries
+
+
 class CUDARuntimeManager:
     """Manages CUDA runtime libraries for GPU acceleration."""
     
@@ -68,14 +221,64 @@ class CUDARuntimeManager:
         self.settings = Settings()
         self.cuda_dir = Path(self.settings.appdata_dir) / "cuda_runtime"
         self.cuda_dir.mkdir(parents=True, exist_ok=True)
+        # Fixed search locations, in lookup order; PATH entries are appended per scan
+        self._search_paths: List[Path] = [self.cuda_dir]
+        if getattr(sys, 'frozen', False):
+            self._search_paths.append(Path(sys._MEIPASS))
+        self._dll_index: Set[str] = set()
+        # (cuda_dir mtime, PATH) of the last library scan; the scan is redone only when it changes
+        self._scan_key: Optional[Tuple[int, str]] = None
         self._check_installed_libraries()
         
+    def _dlls_to_check(self, dll_name: str) -> List[str]:
+        # For cublas, check for both main DLL and cublasLt
+        if dll_name == "cublas64_12.dll":
+            return [dll_name, "cublasLt64_12.dll"]
+        return [dll_name]
+
+    def _build_dll_index(self) -> Set[str]:
+        """Lowercase names of our candidate DLLs found in any search location.
+
+        The fixed search paths (our CUDA directory, the PyInstaller bundle when
+        frozen) and every current PATH entry are each listed once.
+        """
+        wanted = {
+            dll.lower()
+            for lib_name in CUDA_LIBRARIES
+            for dll in self._dlls_to_check(self._get_dll_name(lib_name))
+        }
+        search_dirs = [str(p) for p in self._search_paths]
+        search_dirs.extend(p for p in os.environ.get("PATH", "").split(os.pathsep) if p)
+        found: Set[str] = set()
+        # The same directory can appear several times (e.g. cuda_dir added to PATH)
+        for path_dir in dict.fromkeys(search_dirs):
+            try:
+                names = os.listdir(path_dir)
+            except OSError:
+                continue
+            # Windows file names are case-insensitive
+            found.update(name.lower() for name in names if name.lower() in wanted)
+        return found
+
+    def invalidate(self) -> None:
+        """Force the next _check_installed_libraries call to rescan."""
+        self._scan_key = None
+
     def _check_installed_libraries(self):
         """Check which CUDA libraries are already installed."""
+        try:
+            key = (self.cuda_dir.stat().st_mtime_ns, os.environ.get("PATH", ""))
+        except OSError:
+            key = None
+        # Adding or removing a DLL in cuda_dir bumps its mtime
+        if key is not None and key == self._scan_key:
+            return
+        self._dll_index = self._build_dll_index()
         for lib_name, lib_info in CUDA_LIBRARIES.items():
             dll_name = self._get_dll_name(lib_name)
             installed = self._is_library_installed(dll_name)
             cuda_state.available_libraries[lib_name] = installed
+        self._scan_key = key
             
     def _get_dll_name(self, lib_name: str) -> str:
         """Get the actual DLL filename for a library."""
@@ -88,34 +291,7 @@ class CUDARuntimeManager:
     
     def _is_library_installed(self, dll_name: str) -> bool:
         """Check if a DLL is installed in our CUDA directory or system."""
-        # For cublas, check for both main DLL and cublasLt
-        dlls_to_check = [dll_name]
-        if dll_name == "cublas64_12.dll":
-            dlls_to_check.append("cublasLt64_12.dll")
-            
-        for dll in dlls_to_check:
-            # Check our managed directory
-            if (self.cuda_dir / dll).exists():
-                continue
-                
-            # Check if it's in the PyInstaller bundle
-            if getattr(sys, 'frozen', False):
-                bundle_dir = Path(sys._MEIPASS)
-                if (bundle_dir / dll).exists():
-                    continue
-                    
-            # Check system PATH
-            found_in_path = False
-            for path_dir in os.environ.get("PATH", "").split(os.pathsep):
-                if Path(path_dir) / dll:
-                    if (Path(path_dir) / dll).exists():
-                        found_in_path = True
-                        break
-                        
-            if not found_in_path:
-                return False
-                
-        return True
+        return all(dll.lower() in self._dll_index for dll in self._dlls_to_check(dll_name))
     
     def get_required_libraries(self, feature: str) -> List[str]:
         """Get list of required libraries for a feature (e.g., 'whisper_gpu', 'llama_gpu')."""
@@ -127,6 +303,8 @@ class CUDARuntimeManager:
     
     def check_gpu_ready(self, feature: str) -> Tuple[bool, List[str]]:
         """Check if all required libraries for a feature are available."""
+        # Cheap when nothing changed on disk: one stat of cuda_dir
+        self._check_installed_libraries()
         required = self.get_required_libraries(feature)
         missing = []
         
@@ -145,106 +323,239 @@ class CUDARuntimeManager:
         return total_mb
     
     def download_libraries(self, libraries: List[str], progress_callback=None) -> bool:
-        """Download and install the specified CUDA libraries."""
-        if cuda_state.is_downloading:
-            return False
-            
-        cuda_state.is_downloading = True
-        cuda_state.error_message = None
-        
+        """Download and install the specified CUDA libraries.
+
+        Libraries are fetched in parallel; progress_callback may be called from
+        several worker threads.
+        """
+        with cuda_state.lock:
+            if cuda_state.is_downloading:
+                return False
+            cuda_state.is_downloading = True
+            cuda_state.error_message = None
+
+        to_fetch = [name for name in dict.fromkeys(libraries) if name in CUDA_LIBRARIES]
+        # Thread-safe keep-alive pool shared by the workers; plain urllib3 skips requests'
+        # per-chunk hooks and decoder dispatch on the byte path
+        pool = urllib3.PoolManager(maxsize=MAX_PARALLEL_DOWNLOADS, block=False)
+
         try:
-            for lib_name in libraries:
-                if lib_name not in CUDA_LIBRARIES:
-                    continue
-                    
-                lib_info = CUDA_LIBRARIES[lib_name]
-                cuda_state.current_download = lib_name
-                
-                # Download the wheel file
-                wheel_path = self.cuda_dir / f"{lib_info.name}.whl"
-                if not self._download_file(lib_info.url, wheel_path, lib_name, progress_callback):
-                    cuda_state.error_message = f"Failed to download {lib_name}"
-                    return False
-                
-                # Verify checksum (skip if empty)
-                if lib_info.sha256 and not self._verify_checksum(wheel_path, lib_info.sha256):
-                    cuda_state.error_message = f"Checksum verification failed for {lib_name}"
-                    wheel_path.unlink(missing_ok=True)
-                    return False
-                
-                # Extract DLLs from wheel
-                if not self._extract_dlls_from_wheel(wheel_path, lib_name):
-                    cuda_state.error_message = f"Failed to extract {lib_name}"
-                    return False
-                    
-                # Clean up wheel file
-                wheel_path.unlink(missing_ok=True)
-                
-                # Mark as installed
-                cuda_state.available_libraries[lib_name] = True
-                
+            ok = True
+            if to_fetch:
+                with ThreadPoolExecutor(
+                    max_workers=min(MAX_PARALLEL_DOWNLOADS, len(to_fetch)),
+                    thread_name_prefix="cuda-download",
+                ) as ex:
+                    futures = {
+                        ex.submit(self._download_one, name, pool, progress_callback): name
+                        for name in to_fetch
+                    }
+                    for fut in as_completed(futures):
+                        try:
+                            error = fut.result()
+                        except Exception as e:
+                            error = str(e)
+                        if error:
+                            ok = False
+                            with cuda_state.lock:
+                                # Keep the first failure; later ones are usually consequences
+                                if cuda_state.error_message is None:
+                                    cuda_state.error_message = error
+            if not ok:
+                return False
+
             # Add our CUDA directory to PATH if not already there
             self._update_path()
+            self.invalidate()
             return True
-            
+
         except Exception as e:
             cuda_state.error_message = str(e)
             return False
         finally:
-            cuda_state.is_downloading = False
-            cuda_state.current_download = None
-    
-    def _download_file(self, url: str, dest_path: Path, lib_name: str, progress_callback=None) -> bool:
-        """Download a file with progress tracking."""
+            pool.clear()
+            with cuda_state.lock:
+                cuda_state.is_downloading = False
+                cuda_state.current_download = None
+                cuda_state.active_downloads.clear()
+
+    def _download_one(self, lib_name: str, pool: urllib3.PoolManager, progress_callback=None) -> Optional[str]:
+        """Download, verify and extract one library; returns an error message on failure."""
+        lib_info = CUDA_LIBRARIES[lib_name]
+        cuda_state.set_active(lib_name, True)
         try:
-            response = requests.get(url, stream=True, timeout=30)
-            response.raise_for_status()
-            
-            total_size = int(response.headers.get('content-length', 0))
-            downloaded = 0
+            # Without a checksum to verify, only the DLL members are fetched (no wheel on disk)
+            if not lib_info.sha256:
+                try:
+                    if self._extract_dlls_remote(lib_info.url, lib_name, pool, progress_callback):
+                        with cuda_state.lock:
+                            cuda_state.available_libraries[lib_name] = True
+                        return None
+                except Exception as e:
+                    print(f"Streaming extraction of {lib_name} failed, downloading the wheel: {e}")
+
+            # Download the wheel file
+            wheel_path = self.cuda_dir / f"{lib_info.name}.whl"
+            digest = self._download_file(lib_info.url, wheel_path, lib_name, progress_callback, pool=pool)
+            if digest is None:
+                return f"Failed to download {lib_name}"
+
+            # Verify checksum (skip if empty); the digest was computed during the download
+            # Log the actual checksum for future reference
+            print(f"File: {wheel_path.name}, SHA256: {digest}")
+            if lib_info.sha256 and digest != lib_info.sha256.lower():
+                wheel_path.unlink(missing_ok=True)
+                return f"Checksum verification failed for {lib_name}"
+
+            # Extract DLLs from wheel
+            if not self._extract_dlls_from_wheel(wheel_path, lib_name):
+                return f"Failed to extract {lib_name}"
+
+            # Clean up wheel file
+            wheel_path.unlink(missing_ok=True)
+
+            # Mark as installed
+            with cuda_state.lock:
+                cuda_state.available_libraries[lib_name] = True
+            return None
+        finally:
+            cuda_state.set_active(lib_name, False)
+
+    def _download_file(
+        self,
+        url: str,
+        dest_path: Path,
+        lib_name: str,
+        progress_callback=None,
+        pool: Optional[urllib3.PoolManager] = None,
+    ) -> Optional[str]:
+        """Download a file with progress tracking.
+
+        Returns the SHA-256 hex digest of the downloaded bytes, or None on failure.
+        """
+        # Bytes land in a .part file that is renamed into place once complete; a
+        # .part left by an interrupted attempt is resumed with a Range request
+        part_path = dest_path.with_name(dest_path.name + ".part")
+        pool = pool or urllib3.PoolManager()
+        try:
+            resume = part_path.stat().st_size if part_path.exists() else 0
+            headers = {'Range': f'bytes={resume}-'} if resume else None
+            response = pool.request(
+                "GET",
+                url,
+                headers=headers,
+                preload_content=False,
+                timeout=urllib3.Timeout(connect=30, read=30),
+            )
+            try:
+                if response.status == 416 and resume:
+                    # The partial file does not fit the remote one; start over
+                    part_path.unlink(missing_ok=True)
+                    return self._download_file(url, dest_path, lib_name, progress_callback, pool)
+                if response.status >= 400:
+                    raise RuntimeError(f"HTTP {response.status} for {url}")
+                if response.status != 206:
+                    # Range ignored (or not sent): the body is the whole file
+                    resume = 0
+                
+                total_size = int(response.headers.get('content-length', 0))
+                if total_size:
+                    total_size += resume
+                
+                with open(part_path, 'ab' if resume else 'wb') as f:
+                    writer = _HashingWriter(f, lib_name, total_size, progress_callback, initial=resume)
+                    try:
+                        if resume:
+                            writer.seed(part_path)
+                        # Wheels are served without Content-Encoding, so the raw body is the file;
+                        # only decode when the server did compress it
+                        response.decode_content = bool(response.headers.get('content-encoding'))
+                        shutil.copyfileobj(response, writer, length=DOWNLOAD_CHUNK_SIZE)
+                    finally:
+                        # Stops the hasher thread even on failure; the digest stays available
+                        writer.close()
+            finally:
+                response.release_conn()
             
-            with open(dest_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
-                        downloaded += len(chunk)
-                        
-                        if total_size > 0:
-                            progress = (downloaded / total_size) * 100
-                            cuda_state.download_progress[lib_name] = progress
-                            
-                            if progress_callback:
-                                progress_callback(lib_name, progress)
-                                
-            return True
+            part_path.replace(dest_path)
+            return writer.hexdigest()
         except Exception as e:
             print(f"Download error: {e}")
-            return False
-    
-    def _verify_checksum(self, file_path: Path, expected_sha256: str) -> bool:
-        """Verify file checksum."""
-        sha256_hash = hashlib.sha256()
-        with open(file_path, "rb") as f:
-            for byte_block in iter(lambda: f.read(4096), b""):
-                sha256_hash.update(byte_block)
-        actual_sha256 = sha256_hash.hexdigest()
-        
-        # Log the actual checksum for future reference
-        print(f"File: {file_path.name}, SHA256: {actual_sha256}")
-        
-        return actual_sha256 == expected_sha256
+            return None
     
+    def _extract_dlls_remote(self, url: str, lib_name: str, pool: urllib3.PoolManager, progress_callback=None) -> bool:
+        """Stream the DLL members of a remote wheel straight into our CUDA directory.
+
+        Reads the central directory from the end of the file, then Range-requests each
+        DLL and inflates it to disk, so the wheel is never written or re-read. Returns
+        False when the server or archive layout does not allow this (caller falls back).
+        """
+        entries = _remote_zip_entries(pool, url)
+        if entries is None:
+            return False
+        dlls = [e for e in entries if e.filename.endswith('.dll')]
+        if not dlls or any(e.method not in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED) for e in dlls):
+            return False
+
+        writer_total = sum(e.compressed_size for e in dlls)
+        done = 0
+        for entry in dlls:
+            header = _read_range(pool, url, f"{entry.header_offset}-{entry.header_offset + _ZIP_LFH.size - 1}")
+            if header is None:
+                return False
+            lfh = _ZIP_LFH.unpack_from(header[0])
+            if lfh[0] != b"PK\x03\x04":
+                return False
+            data_start = entry.header_offset + _ZIP_LFH.size + lfh[9] + lfh[10]
+            response = _range_get(pool, url, f"{data_start}-{data_start + entry.compressed_size - 1}")
+            if response is None:
+                return False
+            target_path = self.cuda_dir / Path(entry.filename).name
+            part_path = target_path.with_name(target_path.name + ".part")
+            inflater = zlib.decompressobj(-zlib.MAX_WBITS) if entry.method == zipfile.ZIP_DEFLATED else None
+            crc = 0
+            try:
+                with open(part_path, 'wb') as target:
+                    progress = _HashingWriter(
+                        target, lib_name, writer_total, progress_callback, initial=done, hash_bytes=False
+                    )
+                    for chunk in response.stream(DOWNLOAD_CHUNK_SIZE, decode_content=False):
+                        # Progress counts compressed bytes received
+                        progress.downloaded += len(chunk)
+                        out = inflater.decompress(chunk) if inflater is not None else chunk
+                        crc = zlib.crc32(out, crc)
+                        target.write(out)
+                        progress.report()
+                    if inflater is not None:
+                        out = inflater.flush()
+                        crc = zlib.crc32(out, crc)
+                        target.write(out)
+            finally:
+                response.release_conn()
+            if crc != entry.crc:
+                part_path.unlink(missing_ok=True)
+                raise RuntimeError(f"CRC mismatch for {entry.filename}")
+            part_path.replace(target_path)
+            done += entry.compressed_size
+        return True
+
     def _extract_dlls_from_wheel(self, wheel_path: Path, lib_name: str) -> bool:
         """Extract DLL files from a wheel package."""
         try:
-            with zipfile.ZipFile(wheel_path, 'r') as zip_ref:
-                # Find and extract all DLL files
-                for file_info in zip_ref.filelist:
-                    if file_info.filename.endswith('.dll'):
-                        # Extract to our CUDA directory
-                        target_path = self.cuda_dir / Path(file_info.filename).name
-                        with zip_ref.open(file_info) as source, open(target_path, 'wb') as target:
-                            shutil.copyfileobj(source, target)
+            # Large buffer: fewer read() calls while parsing the central directory and
+            # streaming the big DLL members
+            with open(wheel_path, 'rb', buffering=DOWNLOAD_CHUNK_SIZE) as raw, zipfile.ZipFile(raw, 'r') as zip_ref:
+                # Find all DLL files up front; wheels carry thousands of other entries
+                dll_infos = [i for i in zip_ref.infolist() if i.filename.endswith('.dll')]
+                for file_info in dll_infos:
+                    # Extract to our CUDA directory (flattened)
+                    target_path = self.cuda_dir / Path(file_info.filename).name
+                    if file_info.file_size < SMALL_DLL_BYTES:
+                        # One bulk decompress and a single write()
+                        target_path.write_bytes(zip_ref.read(file_info))
+                        continue
+                    with zip_ref.open(file_info) as source, open(target_path, 'wb') as target:
+                        shutil.copyfileobj(source, target, length=DOWNLOAD_CHUNK_SIZE)
             return True
         except Exception as e:
             print(f"Extraction error: {e}")
@@ -253,7 +564,9 @@ class CUDARuntimeManager:
     def _update_path(self):
         """Add CUDA directory to system PATH for this process."""
         cuda_path = str(self.cuda_dir)
-        if cuda_path not in os.environ.get("PATH", ""):
+        # Compare whole entries; a substring test would also match e.g. ...\cuda_runtime_old
+        path_entries = os.environ.get("PATH", "").split(os.pathsep)
+        if cuda_path not in path_entries:
             os.environ["PATH"] = f"{cuda_path}{os.pathsep}{os.environ.get('PATH', '')}"
             
             # Also update sys.path for Python imports
@@ -266,6 +579,7 @@ class CUDARuntimeManager:
             dll_file.unlink()
         
         # Reset state
+        self.invalidate()
         self._check_installed_libraries()
     
     def get_status(self) -> Dict:
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import hashlib
+import queue
+import threading
+from typing import Optional
+
+
+class BackgroundHasher:
+    """SHA-256 fed from a bounded queue and computed on a worker thread.
+
+    Downloaders hand each chunk over with update() and go straight back to the
+    socket, so hashing overlaps with receiving instead of running in between reads.
+    Chunks must be immutable (bytes) or not reused by the caller. Always call
+    hexdigest() or close(), otherwise the worker thread keeps waiting.
+    """
+
+    def __init__(self, maxsize: int = 8) -> None:
+        self._sha256 = hashlib.sha256()
+        self._q: "queue.Queue[Optional[bytes]]" = queue.Queue(maxsize=maxsize)
+        self._digest: Optional[str] = None
+        self._thread = threading.Thread(target=self._run, name="sha256-hasher", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            chunk = self._q.get()
+            if chunk is None:
+                break
+            # update() releases the GIL for large buffers
+            self._sha256.update(chunk)
+
+    def update(self, chunk: bytes) -> None:
+        self._q.put(chunk)
+
+    def close(self) -> None:
+        if self._thread.is_alive():
+            self._q.put(None)
+            self._thread.join()
+
+    def hexdigest(self) -> str:
+        if self._digest is None:
+            self.close()
+            self._digest = self._sha256.hexdigest()
+        return self._digest
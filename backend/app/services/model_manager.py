@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from threading import Lock
 import hashlib
 import os
@@ -10,7 +10,10 @@ import shutil
 import urllib.request
 import urllib.error
 
+import orjson
+
 from app.config import Settings
+from app.services.hashing import BackgroundHasher
 
 
 @dataclass(frozen=True)
@@ -31,75 +34,101 @@ def get_llm_models_dir(settings: Optional[Settings] = None) -> Path:
     return base
 
 
-def get_llm_presets() -> List[LLMPreset]:
-    # Note: Some models (e.g., Meta Llama) may require license acceptance on Hugging Face.
-    # If download fails with 403, inform the user to place the file manually.
-    return [
-        LLMPreset(
-            id="mistral-7b-instruct-q4_k_m",
-            label="Mistral 7B Instruct v0.2 Q4_K_M (~4.1 GB)",
-            filename="mistral-7b-instruct-v0.2.Q4_K_M.gguf",
-            url=(
-                "https://huggingface.co/TheBloke/Mistral-7B-Instruct-v0.2-GGUF/resolve/main/"
-                "mistral-7b-instruct-v0.2.Q4_K_M.gguf?download=true"
-            ),
-            size_bytes=4_100_000_000,
-            sha256=None,
-            requires_token=False,
+# Note: Some models (e.g., Meta Llama) may require license acceptance on Hugging Face.
+# If download fails with 403, inform the user to place the file manually.
+_PRESETS: Tuple[LLMPreset, ...] = (
+    LLMPreset(
+        id="mistral-7b-instruct-q4_k_m",
+        label="Mistral 7B Instruct v0.2 Q4_K_M (~4.1 GB)",
+        filename="mistral-7b-instruct-v0.2.Q4_K_M.gguf",
+        url=(
+            "https://huggingface.co/TheBloke/Mistral-7B-Instruct-v0.2-GGUF/resolve/main/"
+            "mistral-7b-instruct-v0.2.Q4_K_M.gguf?download=true"
         ),
-        LLMPreset(
-            id="llama-3.1-8b-instruct-q4_k_m",
-            label="Llama 3.1 8B Instruct Q4_K_M (~4.7 GB)",
-            filename="Meta-Llama-3.1-8B-Instruct-Q4_K_M.gguf",
-            url=(
-                "https://huggingface.co/bartowski/Meta-Llama-3.1-8B-Instruct-GGUF/resolve/main/"
-                "Meta-Llama-3.1-8B-Instruct-Q4_K_M.gguf?download=true"
-            ),
-            size_bytes=4_700_000_000,
-            sha256=None,
-            requires_token=True,
+        size_bytes=4_100_000_000,
+        sha256=None,
+        requires_token=False,
+    ),
+    LLMPreset(
+        id="llama-3.1-8b-instruct-q4_k_m",
+        label="Llama 3.1 8B Instruct Q4_K_M (~4.7 GB)",
+        filename="Meta-Llama-3.1-8B-Instruct-Q4_K_M.gguf",
+        url=(
+            "https://huggingface.co/bartowski/Meta-Llama-3.1-8B-Instruct-GGUF/resolve/main/"
+            "Meta-Llama-3.1-8B-Instruct-Q4_K_M.gguf?download=true"
         ),
-        LLMPreset(
-            id="qwen2.5-3b-instruct-q4_k_m",
-            label="Qwen2.5 3B Instruct Q4_K_M (~2.2 GB)",
-            filename="Qwen2.5-3B-Instruct-Q4_K_M.gguf",
-            url=(
-                "https://huggingface.co/bartowski/Qwen2.5-3B-Instruct-GGUF/resolve/main/"
-                "Qwen2.5-3B-Instruct-Q4_K_M.gguf?download=true"
-            ),
-            size_bytes=2_200_000_000,
-            sha256=None,
-            requires_token=False,
+        size_bytes=4_700_000_000,
+        sha256=None,
+        requires_token=True,
+    ),
+    LLMPreset(
+        id="qwen2.5-3b-instruct-q4_k_m",
+        label="Qwen2.5 3B Instruct Q4_K_M (~2.2 GB)",
+        filename="Qwen2.5-3B-Instruct-Q4_K_M.gguf",
+        url=(
+            "https://huggingface.co/bartowski/Qwen2.5-3B-Instruct-GGUF/resolve/main/"
+            "Qwen2.5-3B-Instruct-Q4_K_M.gguf?download=true"
         ),
-        LLMPreset(
-            id="phi-2-2_7b-q4_k_m",
-            label="Phi-2 2.7B Q4_K_M (~1.6 GB)",
-            filename="phi-2.Q4_K_M.gguf",
-            url=(
-                "https://huggingface.co/TheBloke/phi-2-GGUF/resolve/main/"
-                "phi-2.Q4_K_M.gguf?download=true"
-            ),
-            size_bytes=1_600_000_000,
-            sha256=None,
-            requires_token=False,
+        size_bytes=2_200_000_000,
+        sha256=None,
+        requires_token=False,
+    ),
+    LLMPreset(
+        id="phi-2-2_7b-q4_k_m",
+        label="Phi-2 2.7B Q4_K_M (~1.6 GB)",
+        filename="phi-2.Q4_K_M.gguf",
+        url=(
+            "https://huggingface.co/TheBloke/phi-2-GGUF/resolve/main/"
+            "phi-2.Q4_K_M.gguf?download=true"
         ),
-    ]
+        size_bytes=1_600_000_000,
+        sha256=None,
+        requires_token=False,
+    ),
+)
+_PRESETS_BY_ID: Dict[str, LLMPreset] = {p.id: p for p in _PRESETS}
+_PRESETS_BY_FILENAME: Dict[str, LLMPreset] = {p.filename: p for p in _PRESETS}
+
+
+def get_llm_presets() -> List[LLMPreset]:
+    return list(_PRESETS)
 
 
 def resolve_llm_model_path_from_id(preset_id: str, settings: Optional[Settings] = None) -> Path:
-    presets = {p.id: p for p in get_llm_presets()}
-    if preset_id not in presets:
+    preset = _PRESETS_BY_ID.get(preset_id)
+    if preset is None:
         raise ValueError(f"Unknown LLM preset id: {preset_id}")
     models_dir = get_llm_models_dir(settings)
-    return models_dir / presets[preset_id].filename
+    return models_dir / preset.filename
+
+
+def _sequential_opener(path: str, flags: int) -> int:
+    """open() opener that tells the OS the file is streamed front to back once.
+
+    Windows: O_SEQUENTIAL (FILE_FLAG_SEQUENTIAL_SCAN); POSIX: POSIX_FADV_SEQUENTIAL.
+    Both mean more read-ahead and less page-cache retention for multi-GB model files.
+    """
+    # 0o666 (minus umask) like builtin open(); os.open defaults to 0o777
+    fd = os.open(path, flags | getattr(os, "O_SEQUENTIAL", 0), 0o666)
+    if hasattr(os, "posix_fadvise"):
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        except OSError:
+            pass
+    return fd
 
 
 def _sha256_file(path: Path) -> str:
-    h = hashlib.sha256()
-    with path.open("rb") as f:
-        for chunk in iter(lambda: f.read(1024 * 1024), b""):
-            h.update(chunk)
-    return h.hexdigest()
+    # file_digest runs the read/update loop in C
+    with open(path, "rb", opener=_sequential_opener) as f:
+        digest = hashlib.file_digest(f, "sha256").hexdigest()
+        # The hash pass is read-once; don't keep gigabytes of it in the page cache
+        if hasattr(os, "posix_fadvise"):
+            try:
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+            except OSError:
+                pass
+        return digest
 
 
 _dl_lock = Lock()
@@ -122,11 +151,98 @@ def _set_state(**kwargs: object) -> None:
         _dl_state.update(kwargs)
 
 
+def _part_meta_path(tmp: Path) -> Path:
+    return tmp.with_name(tmp.name + ".meta")
+
+
+def _resume_validator(r: object) -> Optional[str]:
+    """If-Range value for a response: a strong ETag, else Last-Modified (weak ETags are not allowed)."""
+    headers = getattr(r, "headers", None)
+    if headers is None:
+        return None
+    etag = headers.get("ETag")
+    if etag and not etag.startswith("W/"):
+        return etag
+    return headers.get("Last-Modified")
+
+
+def _fetch_to_part(url: str, tmp: Path, size_hint: Optional[int] = None, want_digest: bool = False) -> Optional[str]:
+    """Stream url into tmp, resuming from a partial file left by an earlier attempt.
+
+    A partial file is only resumed for the same URL, with If-Range set to the validator
+    the server sent when it was started, so changed remote content is never spliced in.
+    Progress goes to the shared state. Returns the SHA-256 of the complete file when
+    want_digest is set (hashed while streaming unless a resume makes that impossible).
+    """
+    meta_path = _part_meta_path(tmp)
+    resume = tmp.stat().st_size if tmp.exists() else 0
+    headers = {"User-Agent": "MeetingNotes/1.0"}
+    if resume:
+        try:
+            meta = orjson.loads(meta_path.read_bytes())
+        except Exception:
+            meta = None
+        if isinstance(meta, dict) and meta.get("url") == url and meta.get("validator"):
+            headers["Range"] = f"bytes={resume}-"
+            headers["If-Range"] = str(meta["validator"])
+        else:
+            # Unknown origin: the bytes may belong to another URL or an older revision
+            resume = 0
+    try:
+        r = urllib.request.urlopen(urllib.request.Request(url, headers=headers))
+    except urllib.error.HTTPError as e:
+        if e.code != 416 or not resume:
+            raise
+        # The partial file does not fit the remote one (e.g. it changed); start over
+        tmp.unlink(missing_ok=True)
+        meta_path.unlink(missing_ok=True)
+        return _fetch_to_part(url, tmp, size_hint, want_digest)
+    with r:
+        if resume and r.status != 206:
+            # Range ignored: the body is the whole file
+            resume = 0
+        # Hash while writing (on a worker thread) so verification needs no second pass
+        h = BackgroundHasher() if want_digest and not resume else None
+        if not resume:
+            # Record where these bytes come from so an interrupted download can be resumed
+            validator = _resume_validator(r)
+            if validator:
+                meta_path.write_bytes(orjson.dumps({"url": url, "validator": validator}))
+            else:
+                meta_path.unlink(missing_ok=True)
+        length = getattr(r, "length", None)
+        total = resume + length if length else (size_hint or 0)
+        read = resume
+        last_percent = -1
+        block = 1024 * 1024
+        try:
+            with open(tmp, "ab" if resume else "wb", opener=_sequential_opener) as f:
+                while True:
+                    chunk = r.read(block)
+                    if not chunk:
+                        break
+                    f.write(chunk)
+                    if h is not None:
+                        h.update(chunk)
+                    read += len(chunk)
+                    # Update the shared state (and take its lock) once per whole percent
+                    if total and read * 100 // total != last_percent:
+                        last_percent = read * 100 // total
+                        _set_state(progress=min(0.99, float(read) / float(total)))
+        finally:
+            if h is not None:
+                h.close()
+    # Complete: nothing left to resume
+    meta_path.unlink(missing_ok=True)
+    if not want_digest:
+        return None
+    return h.hexdigest() if h is not None else _sha256_file(tmp)
+
+
 def download_llm_preset(preset_id: str, settings: Optional[Settings] = None) -> Path:
-    presets = {p.id: p for p in get_llm_presets()}
-    if preset_id not in presets:
+    preset = _PRESETS_BY_ID.get(preset_id)
+    if preset is None:
         raise ValueError(f"Unknown LLM preset id: {preset_id}")
-    preset = presets[preset_id]
     dst = resolve_llm_model_path_from_id(preset_id, settings)
     tmp = dst.with_suffix(dst.suffix + ".part")
 
@@ -141,46 +257,21 @@ def download_llm_preset(preset_id: str, settings: Optional[Settings] = None) ->
         else:
             return dst
 
-    # Download
+    # Download (resumes a .part left by an interrupted attempt)
     try:
         tmp.parent.mkdir(parents=True, exist_ok=True)
         _set_state(status="running", preset_id=preset_id, progress=0.0, message="starting", path=None)
-        with urllib.request.urlopen(preset.url) as r, tmp.open("wb") as f:
-            total = getattr(r, "length", None) or preset.size_bytes or 0
-            read = 0
-            block = 1024 * 1024
-            while True:
-                chunk = r.read(block)
-                if not chunk:
-                    break
-                f.write(chunk)
-                read += len(chunk)
-                if total:
-                    _set_state(progress=min(0.99, float(read) / float(total)))
+        digest = _fetch_to_part(preset.url, tmp, preset.size_bytes, want_digest=bool(preset.sha256))
     except Exception as e:
-        # Cleanup partial
-        try:
-            if tmp.exists():
-                tmp.unlink()
-        except Exception:
-            pass
+        # Keep the partial file so the next attempt can resume it
         _set_state(status="error", message=str(e))
         raise RuntimeError(f"Failed to download preset '{preset.label}': {e}")
 
     # Verify
-    if preset.sha256:
-        try:
-            digest = _sha256_file(tmp)
-            if digest.lower() != preset.sha256.lower():
-                tmp.unlink(missing_ok=True)
-                raise RuntimeError("Checksum mismatch after download")
-        except Exception:
-            # If verification fails unexpectedly, remove temp and raise
-            try:
-                tmp.unlink()
-            except Exception:
-                pass
-            raise
+    if preset.sha256 and (digest or "").lower() != preset.sha256.lower():
+        tmp.unlink(missing_ok=True)
+        _set_state(status="error", message="checksum mismatch")
+        raise RuntimeError("Checksum mismatch after download")
 
     # Move into place atomically
     tmp.replace(dst)
@@ -211,18 +302,17 @@ def resolve_or_download_llm_model(llm_cfg: Dict[str, object], settings: Optional
         if p.exists():
             return p
         # Guess preset by filename
-        name = p.name
-        for preset in get_llm_presets():
-            if preset.filename == name:
-                dst = resolve_llm_model_path_from_id(preset.id, s)
-                if not dst.exists():
-                    dst = download_llm_preset(preset.id, s)
-                return dst
+        preset = _PRESETS_BY_FILENAME.get(p.name)
+        if preset is not None:
+            dst = resolve_llm_model_path_from_id(preset.id, s)
+            if not dst.exists():
+                dst = download_llm_preset(preset.id, s)
+            return dst
         # Not a known preset; user should place the file manually
         raise FileNotFoundError(f"LLM model file not found: {p}")
 
     # Neither model_id nor model_path provided; choose first preset as default
-    default_preset = get_llm_presets()[0]
+    default_preset = _PRESETS[0]
     dst = resolve_llm_model_path_from_id(default_preset.id, s)
     if not dst.exists():
         dst = download_llm_preset(default_preset.id, s)
@@ -263,25 +353,9 @@ def download_llm_from_url(url: str, filename: Optional[str] = None, settings: Op
     try:
         tmp.parent.mkdir(parents=True, exist_ok=True)
         _set_state(status="running", preset_id="custom-url", progress=0.0, message="starting", path=None)
-        req = urllib.request.Request(url, headers={"User-Agent": "MeetingNotes/1.0"})
-        with urllib.request.urlopen(req) as r, tmp.open("wb") as f:
-            total = getattr(r, "length", None) or 0
-            read = 0
-            block = 1024 * 1024
-            while True:
-                chunk = r.read(block)
-                if not chunk:
-                    break
-                f.write(chunk)
-                read += len(chunk)
-                if total:
-                    _set_state(progress=min(0.99, float(read) / float(total)))
+        _fetch_to_part(url, tmp)
     except Exception as e:
-        try:
-            if tmp.exists():
-                tmp.unlink()
-        except Exception:
-            pass
+        # Keep the partial file so the next attempt can resume it
         _set_state(status="error", message=str(e))
         raise RuntimeError(f"Failed to download from URL: {e}")
 
@@ -3,7 +3,9 @@
 from __future__ import annotations
 
 import logging
-from typing import List, Optional
+import re
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
@@ -87,6 +89,26 @@ TECHNICAL_VOCABULARY = [
     "nullable", "serializable", "idempotent", "mutex", "semaphore",
 ]
 
+# Constant prompt pieces, joined once at import instead of on every prompt build
+_DOMAIN_PROMPT_PREFIX = {mt: DOMAIN_PROMPTS[mt] + " " for mt in MeetingType}
+_TECHNICAL_TERMS_DEFAULT = ", ".join(TECHNICAL_VOCABULARY[:20])  # Don't overwhelm
+_TECHNICAL_TERMS_TAIL = ", ".join(TECHNICAL_VOCABULARY[:10])
+
+
+_PromptKey = Tuple[MeetingType, Tuple[str, ...], Tuple[str, ...], Tuple[str, ...], Tuple[str, ...], Tuple[str, ...]]
+
+
+def _cache_key(context: PromptContext) -> _PromptKey:
+    """Hashable view of exactly the context fields (and slices) the prompt is built from."""
+    return (
+        context.meeting_type,
+        tuple(context.company_names[:5]) if context.company_names else (),
+        tuple(context.speaker_names[:5]) if context.speaker_names else (),
+        tuple(context.technical_terms[:10]) if context.technical_terms else (),
+        tuple(context.custom_vocabulary[:15]) if context.custom_vocabulary else (),
+        tuple(context.previous_segments[-3:]) if context.previous_segments else (),
+    )
+
 
 def generate_initial_prompt(context: PromptContext) -> str:
     """Generate an initial prompt based on context.
@@ -100,43 +122,54 @@ def generate_initial_prompt(context: PromptContext) -> str:
     Returns:
         Initial prompt string for Whisper
     """
-    # Start with domain-specific base
-    prompt_parts = [DOMAIN_PROMPTS[context.meeting_type]]
+    # Repeated contexts (e.g. consecutive chunks of one meeting) reuse the built prompt
+    return _generate_cached(_cache_key(context))
+
+
+@lru_cache(maxsize=256)
+def _generate_cached(key: _PromptKey) -> str:
+    meeting_type, company_names, speaker_names, technical_terms, custom_vocabulary, previous_segments = key
+
+    # Context fragments follow the domain-specific base, separated by single spaces
+    prompt_parts: List[str] = []
     
-    # Add company names if provided
-    if context.company_names:
-        names = ", ".join(context.company_names[:5])  # Limit to avoid too long prompt
+    # Add company names if provided (already limited to 5 to avoid too long prompt)
+    if company_names:
+        names = ", ".join(company_names)
         prompt_parts.append(f"Companies mentioned: {names}.")
     
     # Add speaker names if known
-    if context.speaker_names:
-        speakers = ", ".join(context.speaker_names[:5])
+    if speaker_names:
+        speakers = ", ".join(speaker_names)
         prompt_parts.append(f"Participants: {speakers}.")
     
     # Add technical terms for technical meetings
-    if context.meeting_type == MeetingType.TECHNICAL:
+    if meeting_type == MeetingType.TECHNICAL:
         # Include some common technical terms
-        tech_terms = TECHNICAL_VOCABULARY[:20]  # Don't overwhelm
-        if context.technical_terms:
-            tech_terms = context.technical_terms[:10] + tech_terms[:10]
-        terms = ", ".join(tech_terms)
+        if technical_terms:
+            terms = ", ".join(technical_terms) + ", " + _TECHNICAL_TERMS_TAIL
+        else:
+            terms = _TECHNICAL_TERMS_DEFAULT
         prompt_parts.append(f"Technical terms discussed: {terms}.")
     
     # Add custom vocabulary
-    if context.custom_vocabulary:
-        custom = ", ".join(context.custom_vocabulary[:15])
+    if custom_vocabulary:
+        custom = ", ".join(custom_vocabulary)
         prompt_parts.append(f"Specific terms: {custom}.")
     
     # Add previous context if available (for continued transcription)
-    if context.previous_segments:
+    if previous_segments:
         # Use last 2-3 segments for context
-        recent = " ".join(context.previous_segments[-3:])
+        recent = " ".join(previous_segments)
         # Truncate if too long
         if len(recent) > 200:
             recent = recent[-200:]
         prompt_parts.append(f"Previous discussion: ...{recent}")
     
-    prompt = " ".join(prompt_parts)
+    if prompt_parts:
+        prompt = _DOMAIN_PROMPT_PREFIX[meeting_type] + " ".join(prompt_parts)
+    else:
+        prompt = DOMAIN_PROMPTS[meeting_type]
     
     # Whisper has a 224 token limit for initial prompt
     # Truncate if necessary (roughly 4 chars per token)
@@ -148,6 +181,84 @@ def generate_initial_prompt(context: PromptContext) -> str:
     return prompt
 
 
+# Keyword indicators per meeting type (order is the tie-break order)
+_MEETING_KEYWORDS: Dict[MeetingType, Tuple[str, ...]] = {
+    MeetingType.TECHNICAL: (
+        "code", "api", "database", "deploy", "debug", "pull request",
+        "function", "variable", "algorithm", "frontend", "backend",
+        "server", "client", "framework", "library", "package",
+    ),
+    MeetingType.MEDICAL: (
+        "patient", "symptom", "diagnosis", "treatment", "medication",
+        "prescription", "surgery", "doctor", "nurse", "hospital",
+    ),
+    MeetingType.LEGAL: (
+        "contract", "agreement", "legal", "litigation", "compliance",
+        "regulation", "clause", "liability", "attorney", "court",
+    ),
+    MeetingType.FINANCIAL: (
+        "revenue", "budget", "investment", "profit", "expense",
+        "financial", "accounting", "tax", "audit", "portfolio",
+    ),
+    MeetingType.EDUCATIONAL: (
+        "student", "teacher", "lesson", "homework", "exam",
+        "course", "curriculum", "assignment", "lecture", "tutorial",
+    ),
+    MeetingType.SALES: (
+        "customer", "product", "price", "deal", "proposal",
+        "discount", "quota", "lead", "prospect", "closing",
+    ),
+}
+
+
+# Detection works on integer ids: tally index i counts _DETECTABLE_TYPES[i], and keyword
+# id k is _KEYWORDS[k] = (tally index, keyword), longest first within each type.
+_DETECTABLE_TYPES: Tuple[MeetingType, ...] = tuple(_MEETING_KEYWORDS)
+_KEYWORDS: Tuple[Tuple[int, str], ...] = tuple(
+    (type_id, kw)
+    for type_id, kws in enumerate(_MEETING_KEYWORDS.values())
+    for kw in sorted(kws, key=len, reverse=True)
+)
+_KEYWORD_COUNTS: Tuple[int, ...] = tuple(len(kws) for kws in _MEETING_KEYWORDS.values())
+
+
+# One alternation with a capture group per keyword, so a match's lastindex is its
+# keyword id + 1. Keywords are plain literals (no nested quantifiers), so matching never
+# backtracks badly. Case-insensitive, so the transcript is scanned as is instead of as
+# a lowercased copy; finditer is lazy, so a scan that settles early stops there.
+_KEYWORD_PATTERN = re.compile(
+    r"\b(?:" + "|".join(f"({re.escape(kw)})" for _, kw in _KEYWORDS) + ")",
+    re.IGNORECASE,
+)
+
+
+def _iter_keyword_hits(text: str) -> Iterator[int]:
+    """Keyword id of each case-insensitive keyword occurrence at the start of a word:
+    "code" and "Codes" count, "decode" does not.
+    """
+    for m in _KEYWORD_PATTERN.finditer(text):
+        yield m.lastindex - 1
+
+
+def _detection_settled(scores: List[int], remaining: List[int]) -> bool:
+    """True once the current leader wins whatever the rest of the text contains.
+
+    Every other type, even if all of its unseen keywords still turned up, would stay
+    below the leader (or only tie it from behind in tie-break order).
+    """
+    leader = max(range(len(scores)), key=scores.__getitem__)
+    lead = scores[leader]
+    if lead < 3:  # may still end up GENERAL
+        return False
+    for type_id, score in enumerate(scores):
+        if type_id == leader:
+            continue
+        best = score + remaining[type_id]
+        if best > lead or (best == lead and type_id < leader):
+            return False
+    return True
+
+
 def detect_meeting_type(text: str) -> MeetingType:
     """Auto-detect meeting type from transcript text.
     
@@ -157,67 +268,27 @@ def detect_meeting_type(text: str) -> MeetingType:
     Returns:
         Detected meeting type
     """
-    text_lower = text.lower()
-    
-    # Check for technical indicators
-    technical_keywords = [
-        "code", "api", "database", "deploy", "debug", "pull request",
-        "function", "variable", "algorithm", "frontend", "backend",
-        "server", "client", "framework", "library", "package"
-    ]
-    technical_score = sum(1 for kw in technical_keywords if kw in text_lower)
-    
-    # Check for medical indicators
-    medical_keywords = [
-        "patient", "symptom", "diagnosis", "treatment", "medication",
-        "prescription", "surgery", "doctor", "nurse", "hospital"
-    ]
-    medical_score = sum(1 for kw in medical_keywords if kw in text_lower)
-    
-    # Check for legal indicators
-    legal_keywords = [
-        "contract", "agreement", "legal", "litigation", "compliance",
-        "regulation", "clause", "liability", "attorney", "court"
-    ]
-    legal_score = sum(1 for kw in legal_keywords if kw in text_lower)
-    
-    # Check for financial indicators
-    financial_keywords = [
-        "revenue", "budget", "investment", "profit", "expense",
-        "financial", "accounting", "tax", "audit", "portfolio"
-    ]
-    financial_score = sum(1 for kw in financial_keywords if kw in text_lower)
-    
-    # Check for educational indicators
-    educational_keywords = [
-        "student", "teacher", "lesson", "homework", "exam",
-        "course", "curriculum", "assignment", "lecture", "tutorial"
-    ]
-    educational_score = sum(1 for kw in educational_keywords if kw in text_lower)
-    
-    # Check for sales indicators
-    sales_keywords = [
-        "customer", "product", "price", "deal", "proposal",
-        "discount", "quota", "lead", "prospect", "closing"
-    ]
-    sales_score = sum(1 for kw in sales_keywords if kw in text_lower)
-    
-    # Find highest scoring type
-    scores = {
-        MeetingType.TECHNICAL: technical_score,
-        MeetingType.MEDICAL: medical_score,
-        MeetingType.LEGAL: legal_score,
-        MeetingType.FINANCIAL: financial_score,
-        MeetingType.EDUCATIONAL: educational_score,
-        MeetingType.SALES: sales_score,
-    }
+    # One pass over the text; each keyword counts once however often it occurs. The scan
+    # stops as soon as the remaining text can no longer change the outcome.
+    seen = bytearray(len(_KEYWORDS))
+    scores = [0] * len(_DETECTABLE_TYPES)
+    remaining = list(_KEYWORD_COUNTS)
+    for kw_id in _iter_keyword_hits(text):
+        if seen[kw_id]:
+            continue
+        seen[kw_id] = 1
+        type_id = _KEYWORDS[kw_id][0]
+        scores[type_id] += 1
+        remaining[type_id] -= 1
+        if _detection_settled(scores, remaining):
+            break
     
-    max_score = max(scores.values())
-    if max_score >= 3:  # Threshold for detection
-        for meeting_type, score in scores.items():
-            if score == max_score:
-                logger.info(f"Auto-detected meeting type: {meeting_type} (score: {score})")
-                return meeting_type
+    # First highest score wins ties, in _MEETING_KEYWORDS order
+    best = max(range(len(scores)), key=scores.__getitem__)
+    if scores[best] >= 3:  # Threshold for detection
+        meeting_type = _DETECTABLE_TYPES[best]
+        logger.info(f"Auto-detected meeting type: {meeting_type} (score: {scores[best]})")
+        return meeting_type
     
     return MeetingType.GENERAL
 
@@ -1,12 +1,22 @@
 from __future__ import annotations
 
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, TYPE_CHECKING
-import json
+from functools import lru_cache
+from itertools import islice
+from typing import Any, Dict, List, Optional, Tuple, TYPE_CHECKING
+import atexit
+import gc
+import io
 import os
+import queue
 import re
+import threading
+import time
 from pathlib import Path
 
+import orjson
 from sqlmodel import Session
 
 from app.repositories.summaries import SummariesRepository
@@ -33,6 +43,159 @@ class LlmConfig:
     max_tokens: int = 0
 
 
+# Loaded Llama models kept between summarize calls, keyed by
+# (model_path, n_ctx, n_gpu_layers, n_threads). llama-cpp-python re-evaluates only the
+# tokens after the longest common prefix with what is already in its context, so a warm
+# model skips prefill of the shared prompt prefix. Models are several GB, so only the
+# most recently used configuration is kept. Each entry is a pool: the first instance
+# runs single-chunk summaries and the reduce step, the others map chunks in parallel.
+_MAX_CACHED_LLMS = 1
+_LLM_REGISTRY: "OrderedDict[Tuple[str, int, int, Optional[int]], List[Any]]" = OrderedDict()
+# Held while models are loaded or used: a Llama instance is not safe for concurrent calls
+_LLM_LOCK = threading.Lock()
+# A warm pool pins the weights and KV cache in (V)RAM, which a CUDA transcription needs
+# too; it is freed once no summary has used it for this long
+_LLM_IDLE_RELEASE_S = 300.0
+_llm_last_used = 0.0
+_llm_idle_timer: Optional[threading.Timer] = None
+
+# CPU-only parallel map: one Llama per worker, each with its own share of the cores.
+# Weights are mmapped and shared; each extra instance only adds its own KV cache, which
+# is sized for a single chunk plus its answer rather than the full context.
+_MAX_MAP_WORKERS = 4
+_MIN_THREADS_PER_MAP_WORKER = 4
+_MAP_WORKER_N_CTX = 16384
+
+
+def _map_pool_plan(n_gpu_layers: int) -> Tuple[int, Optional[int]]:
+    """(pool size, threads per instance or None for llama.cpp's default).
+
+    The split depends only on the machine, not on the chunk count, so meetings of
+    different lengths reuse the same loaded pool (n_threads is part of its key);
+    callers use at most one instance per chunk.
+    """
+    # One model copy fits in VRAM, and the high-level API has no batched chat completion
+    if n_gpu_layers > 0:
+        return 1, None
+    cores = max(1, (os.cpu_count() or 2) // 2)
+    workers = min(_MAX_MAP_WORKERS, cores // _MIN_THREADS_PER_MAP_WORKER)
+    if workers < 2:
+        return 1, None
+    return workers, cores // workers
+
+
+def _close_pool(pool: List[Any]) -> None:
+    for llm in pool:
+        close = getattr(llm, "close", None)
+        if callable(close):
+            close()
+    pool.clear()
+    gc.collect()
+
+
+def _release_llms() -> None:
+    """Free all cached models while llama.cpp is still fully loaded.
+
+    Registered with atexit: left to garbage collection at interpreter shutdown, the
+    Llama finalizers can run after the llama.cpp backend has already been torn down.
+    """
+    with _LLM_LOCK:
+        _release_llms_locked()
+
+
+def _release_llms_locked() -> None:
+    while _LLM_REGISTRY:
+        _, pool = _LLM_REGISTRY.popitem(last=False)
+        _close_pool(pool)
+
+
+atexit.register(_release_llms)
+
+
+def _release_if_idle() -> None:
+    with _LLM_LOCK:
+        # A summary since this timer was armed has armed a newer one
+        if time.monotonic() - _llm_last_used >= _LLM_IDLE_RELEASE_S:
+            _release_llms_locked()
+
+
+def _arm_idle_release() -> None:
+    """Restart the idle countdown after a use. Call with _LLM_LOCK held."""
+    global _llm_last_used, _llm_idle_timer
+    _llm_last_used = time.monotonic()
+    if _llm_idle_timer is not None:
+        _llm_idle_timer.cancel()
+    _llm_idle_timer = threading.Timer(_LLM_IDLE_RELEASE_S, _release_if_idle)
+    _llm_idle_timer.daemon = True
+    _llm_idle_timer.start()
+
+
+def _get_llms(model_path: Path, n_ctx: int, n_gpu_layers: int, count: int, n_threads: Optional[int]) -> List["Llama"]:
+    """Return count loaded Llama instances for these parameters. Call with _LLM_LOCK held."""
+    key = (str(model_path), n_ctx, n_gpu_layers, n_threads)
+    pool = _LLM_REGISTRY.get(key)
+    if pool is not None:
+        _LLM_REGISTRY.move_to_end(key)
+    else:
+        # Drop the previous models before loading others so both never sit in (V)RAM together
+        while len(_LLM_REGISTRY) >= _MAX_CACHED_LLMS:
+            _, old_pool = _LLM_REGISTRY.popitem(last=False)
+            _close_pool(old_pool)
+        pool = []
+        _LLM_REGISTRY[key] = pool
+    while len(pool) < count:
+        pool.append(
+            Llama(
+                model_path=str(model_path),
+                # Map workers only ever hold one chunk; the first instance also reduces
+                n_ctx=n_ctx if not pool else min(n_ctx, _MAP_WORKER_N_CTX),
+                n_gpu_layers=n_gpu_layers,
+                n_threads=n_threads,
+                verbose=False,
+            )
+        )
+    return pool[:count]
+
+
+@dataclass(frozen=True)
+class _SummaryPrompts:
+    """Prompt text shared by every LLM call of one summarize run.
+
+    system and the instruction heads are identical for all chunks (and the system
+    prompt for the reduce step too); only the transcript or partials are appended at
+    the tail, so consecutive calls share the longest possible token prefix.
+    """
+    system: str
+    chunk_head: str
+    reduce_head: str
+
+
+_SUMMARY_SYSTEM_PROMPT = (
+    "You write concise meeting summaries. Return ONLY strict JSON with keys "
+    "'abstract_md' and 'bullets_md'. 'bullets_md' is an array of bullet strings. "
+    "Keep citations like [#123] if present. Avoid duplicates."
+)
+
+
+def _build_summary_prompts(profile: Dict[str, Any]) -> _SummaryPrompts:
+    target_bullets = int(profile.get("target_bullets", 10))
+    target_sentences = int(profile.get("target_abstract_sentences", 8))
+    return _SummaryPrompts(
+        system=_SUMMARY_SYSTEM_PROMPT,
+        chunk_head=(
+            "Summarize the transcript chunk below. Output JSON only.\n"
+            f"Abstract: Up to {target_sentences} concise sentences.\n"
+            f"Bullets: Up to {target_bullets} key points that make sense and contain a relevant detail, each one line.\n\n"
+            "Transcript:\n"
+        ),
+        reduce_head=(
+            "Combine the partial summaries below into a final result. Output JSON only.\n"
+            f"Abstract: Up to {target_sentences} sentences.\n"
+            f"Bullets: Up to {target_bullets} deduped key points.\n\n"
+        ),
+    )
+
+
 def summarize_meeting(
     meeting_id: int,
     session: Session,
@@ -63,15 +226,9 @@ def summarize_meeting(
     n_ctx = 65536
     n_gpu_layers = _determine_gpu_layers(settings_dict)
 
-    llm = Llama(
-        model_path=str(model_path),
-        n_ctx=n_ctx,
-        n_gpu_layers=n_gpu_layers,
-        verbose=False,
-    )
-
     # Configure detail profile (short|mid|long) which controls chunking and prompt targets
     profile = _get_length_profile(length or "mid")
+    prompts = _build_summary_prompts(profile)
 
     transcript_text = _render_transcript_with_ids(segments)
     chunks = _chunk_text(
@@ -84,41 +241,90 @@ def summarize_meeting(
     top_p = cfg.top_p if cfg else 0.9
     max_tokens = cfg.max_tokens if cfg and cfg.max_tokens > 0 else 8192
 
-    partials: List[Dict[str, Any]] = []
-    for chunk in chunks:
-        out = _summarize_chunk_json(
-            llm=llm,
+    workers, n_threads = _map_pool_plan(n_gpu_layers)
+    with _LLM_LOCK:
+        try:
+            llms = _get_llms(model_path, n_ctx, n_gpu_layers, min(workers, len(chunks)), n_threads)
+            abstract_md, bullets_list = _summarize_chunks(
+                llms=llms,
+                chunks=chunks,
+                prompts=prompts,
+                temperature=temperature,
+                top_p=top_p,
+                max_tokens=max_tokens,
+            )
+        finally:
+            _arm_idle_release()
+
+    bullets_md = _format_bullets_md(bullets_list)
+
+    summary = SummariesRepository(session).upsert_for_meeting(
+        meeting_id,
+        abstract_md=abstract_md,
+        bullets_md=bullets_md,
+    )
+    return {"summary": summary}
+
+
+def _summarize_chunks(
+    *,
+    llms: List["Llama"],
+    chunks: List[str],
+    prompts: _SummaryPrompts,
+    temperature: float,
+    top_p: float,
+    max_tokens: int,
+) -> Tuple[str, List[str]]:
+    """Map each chunk to a partial summary, then reduce; returns (abstract_md, bullets).
+
+    With more than one instance in llms the chunks are mapped concurrently, each call
+    on an instance no other thread is using (llama.cpp releases the GIL while decoding).
+    """
+    llm = llms[0]
+
+    def _map(chunk: str, chunk_llm: "Llama") -> Dict[str, Any]:
+        return _summarize_chunk_json(
+            llm=chunk_llm,
             chunk_text=chunk,
+            prompts=prompts,
             temperature=temperature,
             top_p=top_p,
             max_tokens=max_tokens,
-            profile=profile,
         )
-        partials.append(out)
+
+    if len(llms) > 1 and len(chunks) > 1:
+        idle: "queue.Queue[Llama]" = queue.Queue()
+        for instance in llms:
+            idle.put(instance)
+
+        def _map_on_idle(chunk: str) -> Dict[str, Any]:
+            instance = idle.get()
+            try:
+                return _map(chunk, instance)
+            finally:
+                idle.put(instance)
+
+        with ThreadPoolExecutor(max_workers=len(llms), thread_name_prefix="llm-map") as pool:
+            # map() keeps chunk order, which the reduce prompt relies on
+            partials = list(pool.map(_map_on_idle, chunks))
+    else:
+        partials = [_map(chunk, llm) for chunk in chunks]
 
     if len(partials) == 1:
-        abstract_md = partials[0].get("abstract_md", "").strip()
+        abstract_md = partials[0].get("abstract_md", "")
         bullets_list = partials[0].get("bullets_md", [])
     else:
         reduce_out = _reduce_summaries_json(
             llm=llm,
             partials=partials,
+            prompts=prompts,
             temperature=temperature,
             top_p=top_p,
             max_tokens=max_tokens,
-            profile=profile,
         )
-        abstract_md = reduce_out.get("abstract_md", "").strip()
+        abstract_md = reduce_out.get("abstract_md", "")
         bullets_list = reduce_out.get("bullets_md", [])
-
-    bullets_md = _format_bullets_md(bullets_list)
-
-    summary = SummariesRepository(session).upsert_for_meeting(
-        meeting_id,
-        abstract_md=abstract_md,
-        bullets_md=bullets_md,
-    )
-    return {"summary": summary}
+    return abstract_md, bullets_list
 
 
 def _resolve_model_path_from_settings(settings_dict: Dict[str, Any], cfg: Optional[LlmConfig]) -> Path:
@@ -139,18 +345,44 @@ def _resolve_model_path_from_settings(settings_dict: Dict[str, Any], cfg: Option
         models_dir.mkdir(parents=True, exist_ok=True)
     except Exception:
         pass
-    found: List[Path] = []
-    for root, _, files in os.walk(models_dir):
-        for f in files:
-            if f.lower().endswith(".gguf"):
-                found.append(Path(root) / f)
-    if found:
-        return sorted(found)[0]
+    found = _default_gguf(models_dir)
+    if found is not None:
+        return found
     raise RuntimeError(
         "No local LLM model configured or found. Configure a GGUF model path in Settings."
     )
 
 
+def _first_gguf(directory: str) -> Optional[Path]:
+    """Smallest .gguf path under directory, in Path ordering, without listing the whole tree.
+
+    Entries are visited in sorted order and subdirectories depth first, so the first hit
+    is what sorting all matches would put first (symlinked dirs are not followed, as in os.walk).
+    """
+    try:
+        with os.scandir(directory) as it:
+            entries = sorted(it, key=lambda e: os.path.normcase(e.name))
+    except OSError:
+        return None
+    for entry in entries:
+        try:
+            if entry.is_dir(follow_symlinks=False):
+                hit = _first_gguf(entry.path)
+                if hit is not None:
+                    return hit
+            elif entry.name.lower().endswith(".gguf"):
+                return Path(entry.path)
+        except OSError:
+            continue
+    return None
+
+
+def _default_gguf(models_dir: Path) -> Optional[Path]:
+    # Not cached: a directory mtime misses models added to nested folders, and the
+    # first-hit scan is cheap
+    return _first_gguf(str(models_dir))
+
+
 def _determine_gpu_layers(settings_dict: Dict[str, Any]) -> int:
     device = str(settings_dict.get("llm_device", "auto")).lower()
     if device == "cpu":
@@ -185,55 +417,49 @@ def _determine_gpu_layers(settings_dict: Dict[str, Any]) -> int:
 
 
 def _render_transcript_with_ids(segments: List["TranscriptSegment"]) -> str:
-    parts: List[str] = []
+    # Written piecewise into one buffer rather than a list of per-segment line strings
+    buf = io.StringIO()
+    write = buf.write
     for seg in segments:
-        sid = getattr(seg, "id", None)
-        speaker = (seg.speaker or "Speaker").strip()
-        marker = f"[#{sid}] " if isinstance(sid, int) else ""
-        parts.append(f"{marker}{speaker}: {seg.text}".strip())
-    return "\n".join(parts)
+        sid = seg.id
+        if isinstance(sid, int):
+            write(f"[#{sid}] ")
+        write((seg.speaker or "Speaker").strip())
+        text = seg.text.rstrip()
+        # "Speaker:" without the trailing space when the segment has no text
+        write(": " + text if text else ":")
+        write("\n")
+    return buf.getvalue()[:-1]
 
 
 def _chunk_text(text: str, max_chars: int = 6000, overlap: int = 600) -> List[str]:
     if max_chars <= 0:
         return [text]
-    chunks: List[str] = []
-    n = len(text)
-    i = 0
-    while i < n:
-        end = min(n, i + max_chars)
-        chunk = text[i:end]
-        chunks.append(chunk)
-        if end >= n:
-            break
-        i = max(0, end - overlap)
-    return chunks
+    if not 0 <= overlap < max_chars:
+        raise ValueError(f"chunk overlap must be in [0, {max_chars}), got {overlap}")
+    if not text:
+        return []
+    # Windows start every (max_chars - overlap) chars; the last one is the first to reach
+    # the end of the text, i.e. starts stop before n - overlap
+    stop = max(1, len(text) - overlap)
+    return [text[i : i + max_chars] for i in range(0, stop, max_chars - overlap)]
 
 
 def _summarize_chunk_json(
     *,
     llm: "Llama",
     chunk_text: str,
+    prompts: _SummaryPrompts,
     temperature: float,
     top_p: float,
     max_tokens: int,
-    profile: Dict[str, Any],
 ) -> Dict[str, Any]:
-    system = (
-        "You write concise meeting summaries. Return ONLY strict JSON with keys "
-        "'abstract_md' and 'bullets_md'. 'bullets_md' is an array of bullet strings. "
-        "Keep citations like [#123] if present."
-    )
-    target_bullets = int(profile.get("target_bullets", 10))
-    target_sentences = int(profile.get("target_abstract_sentences", 8))
-    user = (
-        "Summarize the following transcript chunk. Output JSON only.\n"
-        f"Abstract: Up to {target_sentences} concise sentences.\n"
-        f"Bullets: Up to {target_bullets} key points that make sense and contain a relevant detail, each one line.\n\n"
-        "Transcript:\n" + chunk_text
-    )
+    # Stable instructions first, the variable chunk last: every chunk call of a run
+    # shares the system prompt and instruction tokens as a prefix llama.cpp can reuse.
+    system = prompts.system
+    user = prompts.chunk_head + chunk_text
     grammar = _get_summary_json_grammar()
-    content = _chat_json(
+    content, constrained = _chat_json(
         llm,
         system,
         user,
@@ -242,51 +468,38 @@ def _summarize_chunk_json(
         max_tokens,
         grammar=grammar,
     )
-    data = _parse_json_lenient(content)
+    data = _parse_summary_json(content, constrained)
     if not isinstance(data, dict):
         return {"abstract_md": "", "bullets_md": []}
-    abstract = str(data.get("abstract_md", ""))
-    bullets = data.get("bullets_md", [])
-    if not isinstance(bullets, list):
-        bullets = []
-    bullets = [str(b).strip() for b in bullets if str(b).strip()]
-    return {"abstract_md": abstract, "bullets_md": bullets}
+    abstract = str(data.get("abstract_md", "")).strip()
+    return {"abstract_md": abstract, "bullets_md": _normalize_bullets(data.get("bullets_md", []))}
 
 
 def _reduce_summaries_json(
     *,
     llm: "Llama",
     partials: List[Dict[str, Any]],
+    prompts: _SummaryPrompts,
     temperature: float,
     top_p: float,
     max_tokens: int,
-    profile: Dict[str, Any],
 ) -> Dict[str, Any]:
-    abstracts = [str(p.get("abstract_md", "")) for p in partials if str(p.get("abstract_md", "")).strip()]
+    # Partials come from _summarize_chunk_json: abstracts are stripped, bullets normalized
+    abstracts = [p["abstract_md"] for p in partials if p["abstract_md"]]
     bullets: List[str] = []
     for p in partials:
-        items = p.get("bullets_md", [])
-        if isinstance(items, list):
-            bullets.extend([str(x) for x in items if str(x).strip()])
+        bullets.extend(p["bullets_md"])
 
-    bullets_text = "\n".join(f"- {b.lstrip('- ').strip()}" for b in bullets)
+    bullets_text = "\n".join(f"- {b}" for b in bullets)
     abstracts_text = "\n\n".join(abstracts)
-    system = (
-        "Combine partial meeting summaries into a single concise summary. "
-        "Return ONLY JSON with 'abstract_md' and 'bullets_md' (array). "
-        "Keep citations like [#123] if present. Avoid duplicates."
-    )
-    target_bullets = int(profile.get("target_bullets", 10))
-    target_sentences = int(profile.get("target_abstract_sentences", 8))
+    system = prompts.system
     user = (
-        "Combine the partials into a final result. Output JSON only.\n"
-        f"Abstract: Up to{target_sentences} sentences.\n"
-        f"Bullets: Up to {target_bullets} deduped key points.\n\n"
-        "Abstracts:\n" + abstracts_text + "\n\n" +
-        "Bullets:\n" + bullets_text
+        prompts.reduce_head
+        + "<abstracts>\n" + abstracts_text + "\n</abstracts>\n\n"
+        + "<bullets>\n" + bullets_text + "\n</bullets>"
     )
     grammar = _get_summary_json_grammar()
-    content = _chat_json(
+    content, constrained = _chat_json(
         llm,
         system,
         user,
@@ -295,28 +508,31 @@ def _reduce_summaries_json(
         max_tokens,
         grammar=grammar,
     )
-    data = _parse_json_lenient(content)
+    data = _parse_summary_json(content, constrained)
     if not isinstance(data, dict):
         return {"abstract_md": "", "bullets_md": []}
-    abstract = str(data.get("abstract_md", ""))
-    out_bullets = data.get("bullets_md", [])
-    if not isinstance(out_bullets, list):
-        out_bullets = []
-    out_bullets = [str(b).strip() for b in out_bullets if str(b).strip()]
-    return {"abstract_md": abstract, "bullets_md": out_bullets}
+    abstract = str(data.get("abstract_md", "")).strip()
+    return {"abstract_md": abstract, "bullets_md": _normalize_bullets(data.get("bullets_md", []))}
+
+
+def _normalize_bullets(items: Any) -> List[str]:
+    """Bullet texts from model output without list markers or surrounding whitespace."""
+    if not isinstance(items, list):
+        return []
+    out: List[str] = []
+    for item in items:
+        text = str(item).strip().lstrip("- ").strip()
+        if text:
+            out.append(text)
+    return out
 
 
 def _format_bullets_md(bullets: List[str]) -> str:
-    if not bullets:
-        return ""
-    lines = []
-    seen: set[str] = set()
+    """Markdown list of normalized bullets, dropping case-insensitive duplicates in order."""
+    unique: Dict[str, str] = {}
     for b in bullets:
-        key = b.lstrip("- ").strip()
-        if key and key.lower() not in seen:
-            lines.append(f"- {key}")
-            seen.add(key.lower())
-    return "\n".join(lines)
+        unique.setdefault(b.casefold(), b)
+    return "\n".join(f"- {b}" for b in unique.values())
 
 
 def _get_length_profile(length: str) -> Dict[str, Any]:
@@ -351,88 +567,160 @@ def _chat_json(
     temperature: float,
     top_p: float,
     max_tokens: int,
-) -> str:
-    return _chat_json(
-        llm,
-        system,
-        user,
-        temperature,
-        top_p,
-        max_tokens,
-        grammar=None,
-    )
+    grammar: Optional[object] = None,
+) -> Tuple[str, bool]:
+    """Return (content, constrained): constrained is False when the reply came from the
+    unconstrained plain-completion fallback and may not be valid JSON."""
+    if grammar is not None:
+        return _chat_json_grammar(llm, system, user, temperature, top_p, max_tokens, grammar)
+    return _chat_json_response_format(llm, system, user, temperature, top_p, max_tokens)
 
 
-def _chat_json(
+def _chat_messages(system: str, user: str) -> List[Dict[str, str]]:
+    return [
+        {"role": "system", "content": system},
+        {"role": "user", "content": user},
+    ]
+
+
+def _chat_json_grammar(
     llm: "Llama",
     system: str,
     user: str,
     temperature: float,
     top_p: float,
     max_tokens: int,
-    grammar: Optional[object] = None,
-) -> str:
+    grammar: object,
+) -> Tuple[str, bool]:
+    """Chat completion constrained to JSON by a llama.cpp grammar."""
     try:
-        kwargs: Dict[str, Any] = {
-            "messages": [
-                {"role": "system", "content": system},
-                {"role": "user", "content": user},
-            ],
-            "temperature": temperature,
-            "top_p": top_p,
-            "max_tokens": max_tokens,
-        }
-        if grammar is not None:
-            kwargs["grammar"] = grammar
-        else:
-            kwargs["response_format"] = {"type": "json_object"}
-        resp = llm.create_chat_completion(**kwargs)
-        content = resp["choices"][0]["message"]["content"]
-        return str(content)
+        resp = llm.create_chat_completion(
+            messages=_chat_messages(system, user),
+            temperature=temperature,
+            top_p=top_p,
+            max_tokens=max_tokens,
+            grammar=grammar,
+        )
+        return str(resp["choices"][0]["message"]["content"]), True
     except Exception:
-        # Fallback to plain completion
-        prompt = (
-            f"System: {system}\n\nUser: {user}\n\nAssistant (JSON only):"
+        return _complete_plain(llm, system, user, temperature, top_p, max_tokens), False
+
+
+def _chat_json_response_format(
+    llm: "Llama",
+    system: str,
+    user: str,
+    temperature: float,
+    top_p: float,
+    max_tokens: int,
+) -> Tuple[str, bool]:
+    """Chat completion in llama-cpp-python's JSON mode (itself grammar-constrained),
+    for when no grammar is available."""
+    try:
+        resp = llm.create_chat_completion(
+            messages=_chat_messages(system, user),
+            temperature=temperature,
+            top_p=top_p,
+            max_tokens=max_tokens,
+            response_format={"type": "json_object"},
         )
-        comp = llm(prompt, max_tokens=max_tokens, temperature=temperature, top_p=top_p)
-        return str(comp.get("choices", [{}])[0].get("text", ""))
+        return str(resp["choices"][0]["message"]["content"]), True
+    except Exception:
+        return _complete_plain(llm, system, user, temperature, top_p, max_tokens), False
+
+
+def _complete_plain(
+    llm: "Llama",
+    system: str,
+    user: str,
+    temperature: float,
+    top_p: float,
+    max_tokens: int,
+) -> str:
+    # Fallback to plain completion
+    prompt = (
+        f"System: {system}\n\nUser: {user}\n\nAssistant (JSON only):"
+    )
+    comp = llm(prompt, max_tokens=max_tokens, temperature=temperature, top_p=top_p)
+    return str(comp.get("choices", [{}])[0].get("text", ""))
+
+
+# Fallback parsing of non-JSON model output: "- item" lines, else sentence-like pieces
+_BULLET_LINE_RE = re.compile(r"(?m)^[^\S\n]*-[- ]*[^\S\n]*(.*?)[^\S\n]*$")
+_SENTENCE_RE = re.compile(r"[^\s.;][^\n.;]*")
+
+
+_JSON_STRUCTURE_RE = re.compile(r'[{}"\\]')
+
+
+def _matching_brace(t: str, start: int) -> int:
+    """Index of the "}" closing the object that opens at t[start], or -1.
+
+    Jumps between braces, quotes and backslashes only; braces inside strings don't count.
+    """
+    depth = 0
+    in_string = False
+    skip_to = -1
+    for m in _JSON_STRUCTURE_RE.finditer(t, start):
+        i = m.start()
+        if i < skip_to:  # escaped character
+            continue
+        c = t[i]
+        if in_string:
+            if c == "\\":
+                skip_to = i + 2
+            elif c == '"':
+                in_string = False
+        elif c == '"':
+            in_string = True
+        elif c == "{":
+            depth += 1
+        elif c == "}":
+            depth -= 1
+            if depth == 0:
+                return i
+    return -1
+
+
+def _parse_summary_json(content: str, constrained: bool) -> Any:
+    # Grammar-constrained output is JSON unless max_tokens cut it short
+    if constrained:
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError:
+            pass
+    return _parse_json_lenient(content)
 
 
 def _parse_json_lenient(text: str) -> Any:
     t = (text or "").strip()
     try:
-        return json.loads(t)
+        return orjson.loads(t)
     except Exception:
         pass
-    # Try to extract the first {...} block
+    # Try to extract the first {...} block: up to the brace that closes it when the
+    # object is complete (ignores trailing junk), else up to the last brace as before
     start = t.find("{")
-    end = t.rfind("}")
+    end = _matching_brace(t, start) if start != -1 else -1
+    if end == -1:
+        end = t.rfind("}")
     if start != -1 and end != -1 and end > start:
         sub = t[start : end + 1]
         try:
-            return json.loads(sub)
+            return orjson.loads(sub)
         except Exception:
             pass
     # Attempt to coerce from a lax structure into expected keys
-    bullets = []
-    abstract = ""
-    # Lines starting with '-' as bullets
-    for line in t.splitlines():
-        s = line.strip()
-        if s.startswith("-"):
-            bullets.append(s.lstrip("- ").strip())
+    bullets = [b for b in _BULLET_LINE_RE.findall(t) if b]
     if not bullets:
-        bullets = [s.strip() for s in re.split(r"[\n\.;]", t) if s.strip()][:6]
+        bullets = [m.group().rstrip() for m in islice(_SENTENCE_RE.finditer(t), 6)]
     # First sentence(s) as abstract
     abstract = ". ".join(bullets[:3])
     return {"abstract_md": abstract, "bullets_md": bullets}
 
 
-def _get_summary_json_grammar() -> Optional[object]:
-    """Return a llama.cpp grammar that enforces valid JSON output if available."""
-    if LlamaGrammar is None:
-        return None
-    gbnf = r"""
+# JSON-only grammar for summary responses (GBNF, see llama.cpp grammars/json.gbnf)
+_SUMMARY_JSON_GBNF = r"""
 root   ::= object
 value  ::= object | array | string | number | ("true" | "false" | "null") ws
 
@@ -459,8 +747,19 @@ number ::= ("-"? ([0-9] | [1-9] [0-9]*)) ("." [0-9]+)? ([eE] [-+]? [0-9]+)? ws
 # Optional space: applied in this grammar after literal chars when allowed
 ws ::= ([ \t\n] ws)?
 """
+
+
+@lru_cache(maxsize=1)
+def _get_summary_json_grammar() -> Optional[object]:
+    """Return a llama.cpp grammar that enforces valid JSON output if available.
+
+    Parsed once and shared by all calls (the grammar object is only read).
+    """
+    if LlamaGrammar is None:
+        return None
     try:
-        return LlamaGrammar.from_string(gbnf)
+        # verbose=False: older llama-cpp-python versions print the parsed grammar
+        return LlamaGrammar.from_string(_SUMMARY_JSON_GBNF, verbose=False)
     except Exception:
         return None
 
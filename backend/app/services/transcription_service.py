@@ -1,9 +1,16 @@
 from __future__ import annotations
 
+import hashlib
+import os
+import queue
 import threading
-from dataclasses import dataclass
+from collections import OrderedDict
+from operator import itemgetter
+from dataclasses import asdict, dataclass
 from pathlib import Path
-from typing import Dict, Optional, List
+from typing import Callable, Dict, Optional, List, Tuple
+
+import orjson
 
 from sqlmodel import Session
 
@@ -14,32 +21,197 @@ from app.repositories.transcripts import TranscriptsRepository
 from app.services.asr_engine import WhisperASREngine, ASRConfig
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class JobState:
     status: str = "idle"  # idle|running|done|error
     progress: float = 0.0
     message: Optional[str] = None
 
 
-_jobs: Dict[int, JobState] = {}
-_locks: Dict[int, threading.Lock] = {}
+# JobStates are never mutated: writers store a new one in _jobs, so a reader always gets
+# a consistent (status, progress, message) and can be handed the stored object as is
+_IDLE = JobState()
+
+# Jobs kept for status queries; the least recently updated finished
+# jobs are dropped beyond this, so a long-running backend does not grow without bound
+MAX_TRACKED_JOBS = 1024
+
+_jobs: "OrderedDict[int, JobState]" = OrderedDict()
+# Guards _jobs; worker threads and request handlers both write to them
+_registry_lock = threading.Lock()
+
+# Jobs wait here for one of a fixed set of worker threads instead of each getting its
+# own thread, so a burst of uploads cannot start several Whisper runs at once
+_MAX_QUEUED_JOBS = 64
+_job_queue: "queue.Queue[Callable[[], None]]" = queue.Queue(maxsize=_MAX_QUEUED_JOBS)
+_job_workers: List[threading.Thread] = []
+_job_workers_lock = threading.Lock()
+
+
+def _run_queued_jobs() -> None:
+    while True:
+        job = _job_queue.get()
+        try:
+            job()
+        finally:
+            _job_queue.task_done()
+
+
+def _ensure_job_workers(count: int) -> None:
+    with _job_workers_lock:
+        # Daemon threads, as before: an app shutdown does not wait for a transcription
+        while len(_job_workers) < max(1, count):
+            t = threading.Thread(target=_run_queued_jobs, name=f"transcribe-{len(_job_workers)}", daemon=True)
+            t.start()
+            _job_workers.append(t)
+
+
+# Engine reused by consecutive jobs, keyed by the config fields that select its model.
+# One entry only: an engine keeps a reference to its model, so a second cached engine
+# would pin a model that the asr_engine registry has already evicted.
+_engine_cache: Dict[Tuple[str, str, Optional[str]], WhisperASREngine] = {}
+_engine_lock = threading.Lock()
 
 
-def _get_lock(meeting_id: int) -> threading.Lock:
-    if meeting_id not in _locks:
-        _locks[meeting_id] = threading.Lock()
-    return _locks[meeting_id]
+def _get_engine(cfg: ASRConfig, settings: Settings) -> WhisperASREngine:
+    key = (cfg.model_id, cfg.device, cfg.compute_type)
+    with _engine_lock:
+        engine = _engine_cache.get(key)
+        if engine is None:
+            _engine_cache.clear()
+            engine = WhisperASREngine(settings)
+            _engine_cache[key] = engine
+        return engine
+
+
+# Stored ASR results are evicted least recently used first beyond this total size
+_ASR_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+
+def asr_cache_dir(settings: Settings) -> Path:
+    """Stored ASR results; they hold transcript text, so wiping data must remove them too."""
+    return settings.data_dir / "asr_cache"
+
+
+def _asr_cache_path(audio_path: Path, cfg: ASRConfig, settings: Settings) -> Path:
+    # Content hash of the audio plus every decoding option: a re-recorded file or a
+    # changed setting is a different entry
+    h = hashlib.sha256(orjson.dumps(asdict(cfg), option=orjson.OPT_SORT_KEYS))
+    with open(audio_path, "rb") as f:
+        h.update(hashlib.file_digest(f, "sha256").digest())
+    return asr_cache_dir(settings) / f"{h.hexdigest()}.json"
+
+
+def _load_asr_cache(path: Path) -> Optional[Tuple[List[dict], dict]]:
+    try:
+        segments, info = orjson.loads(path.read_bytes())
+    except Exception:
+        return None
+    try:
+        # mtime doubles as last-use time for eviction
+        os.utime(path)
+    except OSError:
+        pass
+    return segments, info
+
+
+def _prune_asr_cache(cache_dir: Path) -> None:
+    try:
+        entries = []
+        with os.scandir(cache_dir) as it:
+            for e in it:
+                if e.name.endswith(".json"):
+                    st = e.stat()
+                    entries.append((st.st_mtime, st.st_size, e.path))
+    except OSError:
+        return
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= _ASR_CACHE_MAX_BYTES:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+
+
+def _store_asr_cache(path: Path, result: Tuple[List[dict], dict]) -> None:
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(orjson.dumps(result))
+        os.replace(tmp, path)
+    except Exception:
+        pass
+
+
+def _transcribe_cached(
+    engine: WhisperASREngine,
+    audio_paths: List[Path],
+    cfg: ASRConfig,
+    settings: Settings,
+    progress_cb: Optional[Callable[[float, str], None]] = None,
+    force: bool = False,
+) -> List[Tuple[List[dict], dict]]:
+    """engine.transcribe_batch, reusing results stored for identical audio and config.
+
+    Files without a cached result are transcribed together in one batch and their
+    results written back. force bypasses the cache entirely, including the audio hash.
+    """
+    if force:
+        return engine.transcribe_batch(audio_paths, cfg, progress_cb=progress_cb)
+    cache_paths: List[Optional[Path]] = []
+    for p in audio_paths:
+        try:
+            cache_paths.append(_asr_cache_path(p, cfg, settings))
+        except OSError:
+            cache_paths.append(None)
+    results: List[Optional[Tuple[List[dict], dict]]] = [
+        None if cp is None else _load_asr_cache(cp) for cp in cache_paths
+    ]
+    missing = [i for i, r in enumerate(results) if r is None]
+    if missing:
+        fresh = engine.transcribe_batch([audio_paths[i] for i in missing], cfg, progress_cb=progress_cb)
+        for i, result in zip(missing, fresh):
+            results[i] = result
+            cp = cache_paths[i]
+            if cp is not None:
+                _store_asr_cache(cp, result)
+        _prune_asr_cache(settings.data_dir / "asr_cache")
+    return results  # type: ignore[return-value]
+
+
+def _store_job(meeting_id: int, state: JobState) -> None:
+    # Caller holds _registry_lock
+    _jobs[meeting_id] = state
+    _jobs.move_to_end(meeting_id)
+    if len(_jobs) > MAX_TRACKED_JOBS:
+        excess = len(_jobs) - MAX_TRACKED_JOBS
+        # Oldest first; running jobs are kept whatever their age
+        stale = [mid for mid, st in _jobs.items() if st.status != "running"][:excess]
+        for mid in stale:
+            del _jobs[mid]
+
+
+def _set_job(meeting_id: int, state: JobState) -> JobState:
+    with _registry_lock:
+        _store_job(meeting_id, state)
+    return state
 
 
 def get_status(meeting_id: int) -> JobState:
-    return _jobs.get(meeting_id, JobState())
+    with _registry_lock:
+        return _jobs.get(meeting_id, _IDLE)
 
 
 def start_transcription_job(meeting_id: int, session: Session, cfg_dict: dict | None = None) -> JobState:
-    lock = _get_lock(meeting_id)
-    if meeting_id in _jobs and _jobs[meeting_id].status == "running":
-        return _jobs[meeting_id]
-    _jobs[meeting_id] = JobState(status="running", progress=0.0, message="starting")
+    # Check and claim in one step so concurrent starts cannot both launch a worker
+    with _registry_lock:
+        current = _jobs.get(meeting_id)
+        if current is not None and current.status == "running":
+            return current
+        _store_job(meeting_id, JobState(status="running", progress=0.0, message="starting"))
 
     # Snapshot minimal inputs for worker thread
     settings = Settings()
@@ -52,18 +224,19 @@ def start_transcription_job(meeting_id: int, session: Session, cfg_dict: dict |
     asr_cfg_raw = cfg_dict or {}
 
     if meeting is None or not (audio_mic and audio_sys):
-        _jobs[meeting_id] = JobState(status="error", progress=0.0, message="meeting or audio not found")
-        return _jobs[meeting_id]
+        return _set_job(meeting_id, JobState(status="error", progress=0.0, message="meeting or audio not found"))
+
+    # Read DB settings with the request's session so the worker only opens one for the write
+    from app.repositories.settings import get_app_settings
+
+    settings_dict = get_app_settings(session)
+
+    def _set_state(**kw: object) -> None:
+        _set_job(meeting_id, JobState(**kw))  # type: ignore[arg-type]
 
     def _worker() -> None:
         try:
             # Build config from DB settings merged with provided overrides
-            from app.repositories.settings import get_app_settings
-
-            # Need a fresh session in thread
-            from app.models.base import engine as _engine
-            with Session(_engine) as s2:
-                settings_dict = get_app_settings(s2)
             asr_settings = settings_dict.get("asr", {}) if isinstance(settings_dict, dict) else {}
             merged = dict(asr_settings)
             if isinstance(asr_cfg_raw, dict):
@@ -74,96 +247,121 @@ def start_transcription_job(meeting_id: int, session: Session, cfg_dict: dict |
                 mode=str(merged.get("mode", "fast")),
                 language=(merged.get("language") or None),
                 vad=bool(merged.get("vad", True)),
+                # "auto" means the engine's pick (quantized: int8_float16 on CUDA, int8 on CPU)
+                compute_type=(None if merged.get("compute_type") in (None, "", "auto") else str(merged["compute_type"])),
             )
 
-            engine = WhisperASREngine(settings)
-            _jobs[meeting_id] = JobState(status="running", progress=0.0, message="loading model")
+            engine = _get_engine(cfg, settings)
+            _set_state(status="running", progress=0.0, message="loading model")
 
             # Always dual-track (mic+system)
             track_pref = "mic+system"
 
             def _on_progress_weighted(base: float, span: float):
-                def inner(frac: float, phase: str) -> None:
-                    p = base + span * max(0.0, min(1.0, float(frac)))
-                    _jobs[meeting_id] = JobState(status="running", progress=float(p), message=phase)
+                # The engine already throttles ticks and reports floats
+                def inner(frac: float, phase: str, _mid: int = meeting_id) -> None:
+                    p = base + span * (0.0 if frac < 0.0 else 1.0 if frac > 1.0 else frac)
+                    _set_job(_mid, JobState("running", p, phase))
                 return inner
 
             segments_all: List[dict] = []
             if (track_pref == "mic+system") and audio_mic is not None and audio_sys is not None:
-                # Transcribe mic as "You"
-                mic_segments, mic_info = engine.transcribe_file(Path(audio_mic.path), cfg, progress_cb=_on_progress_weighted(0.0, 0.45))
+                # Both tracks in one call so they can share GPU batches
+                # Unchanged audio with the same config reuses the stored result
+                (mic_segments, mic_info), (sys_segments, sys_info) = _transcribe_cached(
+                    engine,
+                    [Path(audio_mic.path), Path(audio_sys.path)],
+                    cfg,
+                    settings,
+                    progress_cb=_on_progress_weighted(0.0, 0.95),
+                    force=bool(asr_cfg_raw.get("force")) if isinstance(asr_cfg_raw, dict) else False,
+                )
+                # Mic is "You"; the dicts double as insert mappings, hence the meeting id
                 for s in mic_segments:
                     s["speaker"] = "You"
-                # Transcribe system as "Remote"
-                sys_segments, sys_info = engine.transcribe_file(Path(audio_sys.path), cfg, progress_cb=_on_progress_weighted(0.5, 0.45))
+                    s["meeting_id"] = meeting_id
+                # System is "Remote"
                 for s in sys_segments:
                     s["speaker"] = "Remote"
+                    s["meeting_id"] = meeting_id
                 segments_all = _merge_and_filter(mic_segments, sys_segments)
                 # Mark near-complete
-                _jobs[meeting_id] = JobState(status="running", progress=0.98, message="finalizing")
+                _set_state(status="running", progress=0.98, message="finalizing")
             else:
                 # Should not happen: require both tracks
                 raise RuntimeError("Mic and system tracks are required")
 
-            # Persist: replace old segments
+            # Persist: replace old segments. The segment dicts already hold every column
+            # with its final type (ints/floats from the engine, speaker and meeting id set
+            # above), so they are inserted as they are instead of being copied
+            # Need a fresh session in thread
+            from app.models.base import engine as _engine
+
             with Session(_engine) as s3:
-                TranscriptsRepository(s3).delete_for_meeting(meeting_id)
-                from app.models.transcript_segment import TranscriptSegment
-
-                rows = [
-                    TranscriptSegment(
-                        meeting_id=meeting_id,
-                        t_start_ms=int(seg.get("t_start_ms", 0)),
-                        t_end_ms=int(seg.get("t_end_ms", 0)),
-                        speaker=str(seg.get("speaker", "Speaker")),
-                        text=str(seg.get("text", "")),
-                        confidence=float(seg["confidence"]) if seg.get("confidence") is not None else None,
-                    )
-                    for seg in segments_all
-                ]
-                TranscriptsRepository(s3).add_segments(rows)
+                TranscriptsRepository(s3).replace_segments(meeting_id, segments_all, commit=False)
 
                 # Persist detected language into Meeting.language (prefer mic, fallback to system)
-                try:
-                    detected_lang = None
-                    if isinstance(mic_info, dict):
-                        detected_lang = mic_info.get("language") or detected_lang
-                    if isinstance(sys_info, dict) and not detected_lang:
-                        detected_lang = sys_info.get("language")
-                    if detected_lang:
-                        m_row = MeetingsRepository(s3).get(meeting_id)
-                        if m_row is not None:
-                            m_row.language = str(detected_lang)
-                            MeetingsRepository(s3).update(m_row)
-                except Exception:
-                    pass
-
-            _jobs[meeting_id] = JobState(status="done", progress=1.0, message="completed")
+                detected_lang = (mic_info.get("language") if isinstance(mic_info, dict) else None) or (
+                    sys_info.get("language") if isinstance(sys_info, dict) else None
+                )
+                if detected_lang:
+                    m_row = MeetingsRepository(s3).get(meeting_id)
+                    if m_row is not None:
+                        # Tracked by the session; flushed with the segments below
+                        m_row.language = str(detected_lang)
+                # Segments and language land in one commit
+                s3.commit()
+
+            _set_state(status="done", progress=1.0, message="completed")
         except Exception as e:
-            _jobs[meeting_id] = JobState(status="error", progress=0.0, message=str(e))
+            _set_state(status="error", progress=0.0, message=str(e))
 
-    t = threading.Thread(target=_worker, daemon=True)
-    t.start()
-    return _jobs[meeting_id]
+    _ensure_job_workers(settings.asr_workers)
+    try:
+        _job_queue.put_nowait(_worker)
+    except queue.Full:
+        return _set_job(meeting_id, JobState(status="error", progress=0.0, message="too many queued transcription jobs"))
+    return get_status(meeting_id)
 
 
-def _filter_and_merge_adjacent(segs: List[dict]) -> List[dict]:
-    # no-op: keep segments as returned by model
-    return segs
+def _time_ordered(segs: List[dict]) -> List[Tuple[Tuple[int, int], str, dict]]:
+    """((start, end), stripped text, segment) per segment, sorted by (start, end).
+
+    Segments come from the engine (or the ASR cache) with the fixed schema that
+    transcribe_batch documents, already typed, so fields are read without casts.
+    """
+    rows = [((seg["t_start_ms"], seg["t_end_ms"]), seg["text"].strip(), seg) for seg in segs]
+    # Whisper emits segments in time order; sort (stably) only if that does not hold
+    if any(rows[i][0] > rows[i + 1][0] for i in range(len(rows) - 1)):
+        rows.sort(key=itemgetter(0))
+    return rows
 
 
 def _merge_and_filter(mic: List[dict], sys: List[dict]) -> List[dict]:
     """Interleave mic and system segments by time and remove obvious duplicates."""
-    all_segs = _filter_and_merge_adjacent([*mic, *sys])
-    all_segs.sort(key=lambda s: (int(s.get("t_start_ms", 0)), int(s.get("t_end_ms", 0))))
-    # Remove exact duplicate texts within 500 ms window
+    a = _time_ordered(mic)
+    b = _time_ordered(sys)
     dedup: List[dict] = []
-    for s in all_segs:
-        if dedup and s.get("text", "").strip() == dedup[-1].get("text", "").strip() and int(s.get("t_start_ms", 0)) - int(dedup[-1].get("t_start_ms", 0)) < 500:
+    last: Optional[dict] = None
+    last_start = 0
+    last_text = ""
+    i = j = 0
+    while i < len(a) or j < len(b):
+        # Two-way merge by (start, end); on ties mic comes first, as with a stable sort
+        if j >= len(b) or (i < len(a) and a[i][0] <= b[j][0]):
+            (start, end), text, seg = a[i]
+            i += 1
+        else:
+            (start, end), text, seg = b[j]
+            j += 1
+        # Remove exact duplicate texts within 500 ms window
+        if last is not None and text == last_text and start - last_start < 500:
             # extend previous
-            dedup[-1]["t_end_ms"] = max(int(dedup[-1].get("t_end_ms", 0)), int(s.get("t_end_ms", 0)))
+            if end > last["t_end_ms"]:
+                last["t_end_ms"] = end
         else:
-            dedup.append(s)
+            dedup.append(seg)
+            last, last_start, last_text = seg, start, text
     return dedup
 
 